@@ -0,0 +1,26 @@
+"""index artifact storage uris for shared blobs
+
+Revision ID: 20261018_0004
+Revises: 20260107_0003
+Create Date: 2026-10-18 00:04:00.000000
+"""
+
+from alembic import op
+
+revision = "20261018_0004"
+down_revision = "20260107_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_artifacts_storage_uri",
+        "artifacts",
+        ["storage_uri"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_artifacts_storage_uri", table_name="artifacts")
@@ -0,0 +1,37 @@
+"""publisher capture policies
+
+Revision ID: 20261018_0005
+Revises: 20261018_0004
+Create Date: 2026-10-18 00:05:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0005"
+down_revision = "20261018_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "publisher_capture_policies",
+        sa.Column("publisher", sa.String(length=255), primary_key=True),
+        sa.Column(
+            "preferred_method", sa.String(length=16), nullable=False, server_default="http"
+        ),
+        sa.Column("http_successes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("browser_captures", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("consecutive_escalations", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("publisher_capture_policies")
@@ -0,0 +1,42 @@
+"""feed states for conditional, adaptive polling
+
+Revision ID: 20261018_0006
+Revises: 20261018_0005
+Create Date: 2026-10-18 00:06:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "20261018_0006"
+down_revision = "20261018_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "feed_states",
+        sa.Column("feed_url", sa.Text(), primary_key=True),
+        sa.Column("etag", sa.Text(), nullable=True),
+        sa.Column("last_modified", sa.Text(), nullable=True),
+        sa.Column("seen_entry_ids", postgresql.JSONB(), nullable=True),
+        sa.Column(
+            "poll_interval_seconds", sa.Integer(), nullable=False, server_default="900"
+        ),
+        sa.Column("last_fetched_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_changed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("next_fetch_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_feed_states_next_fetch_at",
+        "feed_states",
+        ["next_fetch_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_feed_states_next_fetch_at", table_name="feed_states")
+    op.drop_table("feed_states")
@@ -0,0 +1,48 @@
+"""unique index on source item canonical urls
+
+Revision ID: 20261018_0007
+Revises: 20261018_0006
+Create Date: 2026-10-18 00:07:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0007"
+down_revision = "20261018_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        sa.text("UPDATE source_items SET canonical_url = url WHERE canonical_url IS NULL")
+    )
+    # Keep the earliest row per URL as the canonical one; later copies stay in place
+    # (they may already have artifacts and events) but no longer claim the URL.
+    op.execute(
+        sa.text(
+            """
+            UPDATE source_items AS s
+            SET canonical_url = NULL
+            FROM (
+                SELECT id,
+                       row_number() OVER (
+                           PARTITION BY canonical_url ORDER BY discovered_at, id
+                       ) AS rn
+                FROM source_items
+            ) AS ranked
+            WHERE s.id = ranked.id AND ranked.rn > 1
+            """
+        )
+    )
+    op.create_index(
+        "ix_source_items_canonical_url",
+        "source_items",
+        ["canonical_url"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_source_items_canonical_url", table_name="source_items")
@@ -0,0 +1,26 @@
+"""index source items for keyset scans by discovery time
+
+Revision ID: 20261018_0008
+Revises: 20261018_0007
+Create Date: 2026-10-18 00:08:00.000000
+"""
+
+from alembic import op
+
+revision = "20261018_0008"
+down_revision = "20261018_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_source_items_discovered_at_id",
+        "source_items",
+        ["discovered_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_source_items_discovered_at_id", table_name="source_items")
@@ -0,0 +1,39 @@
+"""minhash signatures and lsh bands for near-duplicate texts
+
+Revision ID: 20261018_0009
+Revises: 20261018_0008
+Create Date: 2026-10-18 00:09:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "20261018_0009"
+down_revision = "20261018_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "normalized_texts",
+        sa.Column("minhash", postgresql.ARRAY(sa.Integer()), nullable=True),
+    )
+    op.add_column(
+        "normalized_texts",
+        sa.Column("minhash_bands", postgresql.ARRAY(sa.Integer()), nullable=True),
+    )
+    op.create_index(
+        "ix_normalized_texts_minhash_bands",
+        "normalized_texts",
+        ["minhash_bands"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_normalized_texts_minhash_bands", table_name="normalized_texts")
+    op.drop_column("normalized_texts", "minhash_bands")
+    op.drop_column("normalized_texts", "minhash")
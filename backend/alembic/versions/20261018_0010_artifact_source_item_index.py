@@ -0,0 +1,26 @@
+"""index artifacts by source item for batched text prefetch
+
+Revision ID: 20261018_0010
+Revises: 20261018_0009
+Create Date: 2026-10-18 00:10:00.000000
+"""
+
+from alembic import op
+
+revision = "20261018_0010"
+down_revision = "20261018_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_artifacts_source_item_id",
+        "artifacts",
+        ["source_item_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_artifacts_source_item_id", table_name="artifacts")
@@ -0,0 +1,24 @@
+"""track when source items were handed to the capture queue
+
+Revision ID: 20261018_0011
+Revises: 20261018_0010
+Create Date: 2026-10-18 00:11:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261018_0011"
+down_revision = "20261018_0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "source_items", sa.Column("queued_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("source_items", "queued_at")
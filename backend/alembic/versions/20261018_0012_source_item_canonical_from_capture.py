@@ -0,0 +1,31 @@
+"""record whether canonical_url came from the captured page
+
+Revision ID: 20261018_0012
+Revises: 20261018_0011
+Create Date: 2026-10-18 00:12:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261018_0012"
+down_revision = "20261018_0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "source_items",
+        sa.Column(
+            "canonical_from_capture", sa.Boolean(), nullable=False, server_default=sa.false()
+        ),
+    )
+    op.execute(
+        "UPDATE source_items SET canonical_from_capture = true "
+        "WHERE capture_status = 'captured' AND canonical_url IS DISTINCT FROM url"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("source_items", "canonical_from_capture")
@@ -0,0 +1,22 @@
+"""record the RQ job that holds each queued source item
+
+Revision ID: 20261018_0013
+Revises: 20261018_0012
+Create Date: 2026-10-18 00:13:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261018_0013"
+down_revision = "20261018_0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("source_items", sa.Column("capture_job_id", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("source_items", "capture_job_id")
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Iterable
+
+from playwright.async_api import Browser, Error as PlaywrightError, Route, async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from sqlalchemy.orm import Session
+
+from app.capture import CANONICAL_LINK_SCRIPT, backfill_canonical_url, write_page_artifacts
+from app.capture_profile import InterceptionProfile, get_interception_profile
+from app.models import SourceItem
+from app.settings import get_capture_concurrency, get_capture_timeout_ms
+
+
+@dataclass
+class CaptureBatchResult:
+    captured: int = 0
+    failed: int = 0
+    artifacts: int = 0
+
+
+async def _render_page(
+    browser: Browser, url: str, timeout_ms: int, profile: InterceptionProfile
+) -> tuple[dict[str, bytes], str | None]:
+    context = await browser.new_context()
+    try:
+        if profile.intercepts:
+
+            async def intercept(route: Route) -> None:
+                if profile.should_block(route.request.resource_type, route.request.url):
+                    await route.abort()
+                else:
+                    await route.continue_()
+
+            await context.route("**/*", intercept)
+        page = await context.new_page()
+        await page.goto(url, timeout=timeout_ms, wait_until=profile.wait_until)
+        if profile.settle_ms:
+            try:
+                await page.wait_for_load_state("networkidle", timeout=profile.settle_ms)
+            except PlaywrightTimeoutError:
+                pass
+        payloads = {
+            "screenshot": await page.screenshot(full_page=True),
+            "pdf": await page.pdf(),
+            "text": (await page.inner_text("body")).encode("utf-8"),
+        }
+        return payloads, await page.evaluate(CANONICAL_LINK_SCRIPT)
+    finally:
+        await context.close()
+
+
+async def _capture_one(
+    db: Session,
+    browser: Browser,
+    source_item_id: str,
+    timeout_ms: int,
+    profile: InterceptionProfile,
+    result: CaptureBatchResult,
+) -> None:
+    source_item = db.get(SourceItem, source_item_id)
+    if source_item is None:
+        result.failed += 1
+        return
+
+    source_item.capture_status = "capturing"
+    db.commit()
+    item_id = source_item.id
+    url = source_item.url
+    publisher = source_item.publisher
+
+    try:
+        payloads, canonical_href = await asyncio.wait_for(
+            _render_page(browser, url, timeout_ms, profile), timeout=timeout_ms / 1000
+        )
+        artifacts = await asyncio.to_thread(
+            write_page_artifacts, item_id, publisher, payloads, profile.tool_version
+        )
+    except (PlaywrightError, asyncio.TimeoutError, OSError, ValueError):
+        source_item.capture_status = "failed"
+        db.commit()
+        result.failed += 1
+        return
+
+    db.add_all(artifacts)
+    backfill_canonical_url(db, item_id, canonical_href)
+    source_item.capture_status = "captured"
+    db.commit()
+    result.captured += 1
+    result.artifacts += len(artifacts)
+
+
+async def capture_source_items_async(
+    db: Session,
+    source_item_ids: Iterable[str],
+    concurrency: int | None = None,
+    timeout_ms: int | None = None,
+) -> CaptureBatchResult:
+    concurrency = max(1, concurrency or get_capture_concurrency())
+    timeout_ms = timeout_ms or get_capture_timeout_ms()
+    profile = get_interception_profile()
+    result = CaptureBatchResult()
+    pending: asyncio.Queue[str | None] = asyncio.Queue(maxsize=concurrency)
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch()
+
+        async def produce() -> None:
+            for source_item_id in source_item_ids:
+                await pending.put(source_item_id)
+            for _ in range(concurrency):
+                await pending.put(None)
+
+        async def consume() -> None:
+            while (source_item_id := await pending.get()) is not None:
+                await _capture_one(db, browser, source_item_id, timeout_ms, profile, result)
+
+        try:
+            await asyncio.gather(produce(), *(consume() for _ in range(concurrency)))
+        finally:
+            await browser.close()
+    return result
+
+
+def capture_source_items(
+    db: Session,
+    source_item_ids: Iterable[str],
+    concurrency: int | None = None,
+    timeout_ms: int | None = None,
+) -> CaptureBatchResult:
+    return asyncio.run(capture_source_items_async(db, source_item_ids, concurrency, timeout_ms))
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import atexit
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from playwright.sync_api import Browser, BrowserContext, Error as PlaywrightError, Playwright
+from playwright.sync_api import sync_playwright
+
+from app.settings import get_browser_max_pages, get_browser_pool_size
+
+
+@dataclass
+class _BrowserSlot:
+    browser: Browser | None = None
+    pages: int = 0
+
+
+class BrowserPool:
+    def __init__(self, size: int | None = None, max_pages: int | None = None) -> None:
+        self.size = max(1, size or get_browser_pool_size())
+        self.max_pages = max(1, max_pages or get_browser_max_pages())
+        self._playwright: Playwright | None = None
+        self._slots = [_BrowserSlot() for _ in range(self.size)]
+        self._next_slot = 0
+
+    def start(self) -> BrowserPool:
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        return self
+
+    def close(self) -> None:
+        for slot in self._slots:
+            self._retire(slot)
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    def __enter__(self) -> BrowserPool:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @contextmanager
+    def context(self, **context_options) -> Iterator[BrowserContext]:
+        slot = self._checkout()
+        context = slot.browser.new_context(**context_options)
+        healthy = True
+        try:
+            yield context
+        finally:
+            try:
+                context.close()
+            except PlaywrightError:
+                healthy = False
+            slot.pages += 1
+            if not healthy or slot.pages >= self.max_pages or not slot.browser.is_connected():
+                self._retire(slot)
+
+    def _checkout(self) -> _BrowserSlot:
+        self.start()
+        slot = self._slots[self._next_slot]
+        self._next_slot = (self._next_slot + 1) % self.size
+        if slot.browser is None or not slot.browser.is_connected():
+            self._retire(slot)
+            slot.browser = self._playwright.chromium.launch()
+        return slot
+
+    def _retire(self, slot: _BrowserSlot) -> None:
+        if slot.browser is not None:
+            try:
+                slot.browser.close()
+            except PlaywrightError:
+                pass
+        slot.browser = None
+        slot.pages = 0
+
+
+_worker_pool: BrowserPool | None = None
+
+
+def get_browser_pool() -> BrowserPool:
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = BrowserPool().start()
+        atexit.register(_worker_pool.close)
+    return _worker_pool
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from app.settings import get_canonical_rules_path
+
+_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+_TRACKING_PARAMS = frozenset(
+    {
+        "_ga",
+        "at_campaign",
+        "at_medium",
+        "cmpid",
+        "dclid",
+        "fbclid",
+        "gclid",
+        "guccounter",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "msclkid",
+        "ns_campaign",
+        "ns_mchannel",
+        "ns_source",
+        "ocid",
+        "ref",
+        "ref_src",
+        "smid",
+        "taid",
+        "yclid",
+    }
+)
+_TRACKING_PREFIXES = ("utm_",)
+_AMP_PARAMS = {"amp": {"1", "true", ""}, "outputtype": {"amp"}}
+_AMP_PATH_RE = re.compile(r"(?:/amp/?|\.amp)$", re.IGNORECASE)
+_AMP_SEGMENT_RE = re.compile(r"^/amp(?=/)", re.IGNORECASE)
+_CANONICAL_LINK_RE = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_REL_CANONICAL_RE = re.compile(r"""\brel\s*=\s*["']?canonical["'\s>/]""", re.IGNORECASE)
+_HREF_RE = re.compile(r"""\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1)
+def _load_rules(path: str) -> dict[str, dict]:
+    rules_path = Path(path)
+    if not rules_path.exists():
+        return {}
+    return json.loads(rules_path.read_text(encoding="utf-8"))
+
+
+def _rules_for(host: str) -> dict:
+    rules = _load_rules(get_canonical_rules_path())
+    while host:
+        if host in rules:
+            return rules[host]
+        _, _, host = host.partition(".")
+    return {}
+
+
+def _is_tracking_param(key: str) -> bool:
+    lowered = key.lower()
+    return lowered in _TRACKING_PARAMS or lowered.startswith(_TRACKING_PREFIXES)
+
+
+def _is_amp_param(key: str, value: str) -> bool:
+    allowed = _AMP_PARAMS.get(key.lower())
+    return allowed is not None and value.lower() in allowed
+
+
+def canonicalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        return url.strip()
+
+    host = (parts.hostname or "").lower().rstrip(".")
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix) :]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = _AMP_SEGMENT_RE.sub("", parts.path)
+    path = _AMP_PATH_RE.sub("", path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    rules = _rules_for(host)
+    query = ""
+    if not rules.get("drop_query"):
+        keep = {param.lower() for param in rules.get("keep_params", [])}
+        params = [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking_param(key)
+            and not _is_amp_param(key, value)
+            and (not keep or key.lower() in keep)
+        ]
+        query = urlencode(sorted(params))
+
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def extract_canonical_link(html: str, base_url: str) -> str | None:
+    for match in _CANONICAL_LINK_RE.finditer(html):
+        tag = match.group(0)
+        if not _REL_CANONICAL_RE.search(tag + " "):
+            continue
+        href = _HREF_RE.search(tag)
+        if href:
+            value = next(group for group in href.groups() if group is not None).strip()
+            if value:
+                return urljoin(base_url, value)
+    return None
@@ -1,140 +1,443 @@
 from __future__ import annotations
 
-from datetime import datetime
+import uuid
+from dataclasses import dataclass
+from typing import Iterable, Iterator
 
-from playwright.sync_api import sync_playwright
 import requests
+from playwright.sync_api import Error as PlaywrightError, Route
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.db import SessionLocal, init_engine
+from app.browser_pool import BrowserPool, get_browser_pool
+from app.canonical import canonicalize_url, extract_canonical_link
+from app.capture_profile import InterceptionProfile, get_interception_profile
+from app.capture_policy import choose_method, get_policy, looks_like_shell, record_outcome
+from app.db import SessionLocal, get_worker_engine
+from app.http_client import get_http_session
 from app.models import Artifact, SourceItem
-from app.settings import get_capture_timeout_ms
-from app.storage import build_artifact_path, date_key_for, write_bytes, write_text, write_text_bytes
+from app.settings import get_capture_timeout_ms, get_max_capture_bytes
+from app.storage import (
+    STREAM_CHUNK_BYTES,
+    write_blob,
+    write_blob_stream,
+)
 
 
-def capture_source_item(db: Session, source_item_id: str) -> int:
-    source_item = db.get(SourceItem, source_item_id)
-    if source_item is None:
-        raise ValueError(f"source_item not found: {source_item_id}")
+PAGE_ARTIFACTS = (("screenshot", "png"), ("pdf", "pdf"), ("text", "txt"))
+THROTTLE_STATUSES = (429, 503)
+HTML_HEAD_BYTES = 256 * 1024
+CANONICAL_LINK_SCRIPT = (
+    "() => { const link = document.querySelector('link[rel=\"canonical\"]');"
+    " return link ? link.href : null; }"
+)
 
-    source_item.capture_status = "capturing"
-    db.commit()
 
-    created = 0
-    with sync_playwright() as playwright:
-        browser = playwright.chromium.launch()
-        context = browser.new_context()
-        page = context.new_page()
-        page.goto(source_item.url, timeout=get_capture_timeout_ms(), wait_until="networkidle")
+class CaptureThrottled(Exception):
+    def __init__(self, url: str, status: int, retry_after: str | None) -> None:
+        super().__init__(f"{url} answered {status}")
+        self.status = status
+        self.retry_after = retry_after
 
-        date_key = date_key_for(source_item.published_at or datetime.utcnow())
 
-        screenshot_path = build_artifact_path(
-            date_key, source_item.publisher, str(source_item.id), "screenshot", "png"
-        )
-        screenshot_bytes = page.screenshot(full_page=True)
-        size, sha256 = write_bytes(screenshot_path, screenshot_bytes)
-        db.add(
+def write_page_artifacts(
+    source_item_id: uuid.UUID,
+    publisher: str | None,
+    payloads: dict[str, bytes],
+    tool_version: str = "playwright-python",
+) -> list[Artifact]:
+    artifacts: list[Artifact] = []
+    for artifact_type, ext in PAGE_ARTIFACTS:
+        path, size, sha256 = write_blob(payloads[artifact_type], ext, publisher)
+        artifacts.append(
             Artifact(
-                source_item_id=source_item.id,
-                type="screenshot",
-                storage_uri=screenshot_path,
+                source_item_id=source_item_id,
+                type=artifact_type,
+                storage_uri=path,
                 bytes=size,
                 sha256=sha256,
-                tool_version="playwright-python",
+                tool_version=tool_version,
             )
         )
-        created += 1
+    return artifacts
 
-        pdf_path = build_artifact_path(
-            date_key, source_item.publisher, str(source_item.id), "pdf", "pdf"
-        )
-        pdf_bytes = page.pdf()
-        size, sha256 = write_bytes(pdf_path, pdf_bytes)
-        db.add(
-            Artifact(
-                source_item_id=source_item.id,
-                type="pdf",
-                storage_uri=pdf_path,
-                bytes=size,
-                sha256=sha256,
-                tool_version="playwright-python",
-            )
-        )
-        created += 1
 
-        body_text = page.inner_text("body")
-        text_path = build_artifact_path(
-            date_key, source_item.publisher, str(source_item.id), "text", "txt"
-        )
-        size, sha256 = write_text(text_path, body_text)
-        db.add(
-            Artifact(
-                source_item_id=source_item.id,
-                type="text",
-                storage_uri=text_path,
-                bytes=size,
-                sha256=sha256,
-                tool_version="playwright-python",
-            )
-        )
-        created += 1
+def capture_source_item(db: Session, source_item_id: str, pool: BrowserPool | None = None) -> int:
+    if pool is None:
+        with BrowserPool(size=1) as own_pool:
+            return capture_source_item(db, source_item_id, own_pool)
 
-        context.close()
-        browser.close()
+    source_item = db.get(SourceItem, source_item_id)
+    if source_item is None:
+        raise ValueError(f"source_item not found: {source_item_id}")
+
+    source_item.capture_status = "capturing"
+    db.commit()
+
+    profile = get_interception_profile()
+    try:
+        payloads, canonical_href = _render_page(pool, source_item.url, profile)
+    except CaptureThrottled:
+        source_item.capture_status = "queued"
+        db.commit()
+        raise
+    artifacts = write_page_artifacts(
+        source_item.id, source_item.publisher, payloads, profile.tool_version
+    )
+    db.add_all(artifacts)
+    created = len(artifacts)
+    backfill_canonical_url(db, source_item.id, canonical_href)
 
     source_item.capture_status = "captured"
     db.commit()
     return created
 
 
+def _render_page(
+    pool: BrowserPool, url: str, profile: InterceptionProfile
+) -> tuple[dict[str, bytes], str | None]:
+    with pool.context() as context:
+        if profile.intercepts:
+
+            def intercept(route: Route) -> None:
+                if profile.should_block(route.request.resource_type, route.request.url):
+                    route.abort()
+                else:
+                    route.continue_()
+
+            context.route("**/*", intercept)
+        page = context.new_page()
+        response = page.goto(url, timeout=get_capture_timeout_ms(), wait_until=profile.wait_until)
+        if response is not None and response.status in THROTTLE_STATUSES:
+            raise CaptureThrottled(url, response.status, response.headers.get("retry-after"))
+        if profile.settle_ms:
+            try:
+                page.wait_for_load_state("networkidle", timeout=profile.settle_ms)
+            except PlaywrightTimeoutError:
+                pass
+        payloads = {
+            "screenshot": page.screenshot(full_page=True),
+            "pdf": page.pdf(),
+            "text": page.inner_text("body").encode("utf-8"),
+        }
+        return payloads, page.evaluate(CANONICAL_LINK_SCRIPT)
+
+
+def backfill_canonical_url(
+    db: Session, source_item_id: uuid.UUID, href: str | None, from_capture: bool = True
+) -> bool:
+    if not href:
+        return False
+    canonical = canonicalize_url(href)
+    claimed = select(SourceItem.id).where(SourceItem.canonical_url == canonical).exists()
+    stmt = (
+        update(SourceItem)
+        .where(SourceItem.id == source_item_id)
+        .where(SourceItem.canonical_url.is_distinct_from(canonical))
+        .where(~claimed)
+        .values(canonical_url=canonical, canonical_from_capture=from_capture)
+    )
+    try:
+        with db.begin_nested():
+            return db.execute(stmt).rowcount > 0
+    except IntegrityError:
+        return False
+
+
+def _keep_head(chunks: Iterable[bytes], head: bytearray) -> Iterator[bytes]:
+    for chunk in chunks:
+        if len(head) < HTML_HEAD_BYTES:
+            head += chunk[: HTML_HEAD_BYTES - len(head)]
+        yield chunk
+
+
+def _validators_from(response: requests.Response) -> dict | None:
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    return {key: value for key, value in validators.items() if value} or None
+
+
+def _fetch_html_artifact(
+    source_item_id: uuid.UUID,
+    url: str,
+    publisher: str | None,
+    validators: dict | None = None,
+) -> tuple[Artifact | None, dict | None, str]:
+    headers = {}
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    with get_http_session().get(url, timeout=20, stream=True, headers=headers) as response:
+        if headers and response.status_code == 304:
+            return None, validators, ""
+        if response.status_code in THROTTLE_STATUSES:
+            raise CaptureThrottled(
+                url, response.status_code, response.headers.get("Retry-After")
+            )
+        response.raise_for_status()
+        declared = int(response.headers.get("Content-Length") or 0)
+        if declared > get_max_capture_bytes():
+            raise ValueError(f"artifact exceeds max size: {declared} bytes")
+        head = bytearray()
+        html_path, size, sha256 = write_blob_stream(
+            _keep_head(response.iter_content(STREAM_CHUNK_BYTES), head), "html", publisher
+        )
+        fresh_validators = _validators_from(response)
+
+    artifact = Artifact(
+        source_item_id=source_item_id,
+        type="html",
+        storage_uri=html_path,
+        bytes=size,
+        sha256=sha256,
+        tool_version="requests",
+    )
+    return artifact, fresh_validators, head.decode("utf-8", errors="ignore")
+
+
+def _ids_with_html(db: Session, source_item_ids: list[uuid.UUID]) -> set[uuid.UUID]:
+    if not source_item_ids:
+        return set()
+    stmt = (
+        select(Artifact.source_item_id)
+        .where(Artifact.source_item_id.in_(source_item_ids))
+        .where(Artifact.type == "html")
+        .distinct()
+    )
+    return set(db.execute(stmt).scalars().all())
+
+
+def _recapture_validators(db: Session, source_item: SourceItem) -> dict | None:
+    if source_item.fetch_headers and _ids_with_html(db, [source_item.id]):
+        return source_item.fetch_headers
+    return None
+
+
 def capture_text_only(db: Session, source_item_id: str) -> int:
     source_item = db.get(SourceItem, source_item_id)
     if source_item is None:
         raise ValueError(f"source_item not found: {source_item_id}")
 
+    validators = _recapture_validators(db, source_item)
     source_item.capture_status = "capturing"
     db.commit()
 
-    response = requests.get(source_item.url, timeout=20)
-    response.raise_for_status()
+    try:
+        artifact, source_item.fetch_headers, head_html = _fetch_html_artifact(
+            source_item.id, source_item.url, source_item.publisher, validators
+        )
+    except CaptureThrottled:
+        source_item.capture_status = "queued"
+        db.commit()
+        raise
+    if artifact is not None:
+        db.add(artifact)
+        href = extract_canonical_link(head_html, source_item.url)
+        backfill_canonical_url(db, source_item.id, href)
 
-    date_key = date_key_for(source_item.published_at or datetime.utcnow())
-    html_path = build_artifact_path(
-        date_key, source_item.publisher, str(source_item.id), "html", "html"
-    )
-    size, sha256 = write_text_bytes(html_path, response.content)
-    db.add(
-        Artifact(
-            source_item_id=source_item.id,
-            type="html",
-            storage_uri=html_path,
-            bytes=size,
-            sha256=sha256,
-            tool_version="requests",
+    source_item.capture_status = "captured"
+    db.commit()
+    return 0 if artifact is None else 1
+
+
+def capture_adaptive(db: Session, source_item_id: str, pool: BrowserPool | None = None) -> int:
+    source_item = db.get(SourceItem, source_item_id)
+    if source_item is None:
+        raise ValueError(f"source_item not found: {source_item_id}")
+
+    policy = get_policy(db, source_item.publisher)
+    if choose_method(policy) == "browser":
+        record_outcome(policy, "browser", escalated=False)
+        return capture_source_item(db, source_item_id, pool)
+
+    validators = _recapture_validators(db, source_item)
+    source_item.capture_status = "capturing"
+    db.commit()
+
+    artifact = None
+    head_html = ""
+    escalate = False
+    try:
+        artifact, fresh_validators, head_html = _fetch_html_artifact(
+            source_item.id, source_item.url, source_item.publisher, validators
         )
-    )
+    except CaptureThrottled:
+        source_item.capture_status = "queued"
+        db.commit()
+        raise
+    except requests.HTTPError:
+        escalate = True
+    except (requests.RequestException, OSError, ValueError):
+        source_item.capture_status = "failed"
+        db.commit()
+        return 0
+    else:
+        source_item.fetch_headers = fresh_validators
+        if artifact is not None:
+            escalate = looks_like_shell(head_html)
 
+    record_outcome(policy, "http", escalated=escalate)
+    if escalate:
+        db.commit()
+        return capture_source_item(db, source_item_id, pool)
+
+    if artifact is not None:
+        db.add(artifact)
+        href = extract_canonical_link(head_html, source_item.url)
+        backfill_canonical_url(db, source_item.id, href)
     source_item.capture_status = "captured"
     db.commit()
-    return 1
+    return 0 if artifact is None else 1
+
+
+@dataclass
+class _BatchItem:
+    item: SourceItem
+    id: uuid.UUID
+    url: str
+    publisher: str | None
+    fetch_headers: dict | None
+
+
+def _claim_batch(db: Session, source_item_ids: list[str]) -> list[_BatchItem]:
+    items = (
+        db.execute(select(SourceItem).where(SourceItem.id.in_(source_item_ids))).scalars().all()
+    )
+    claimed = [
+        _BatchItem(item, item.id, item.url, item.publisher, item.fetch_headers) for item in items
+    ]
+    for item in items:
+        item.capture_status = "capturing"
+    db.commit()
+    return claimed
+
+
+def capture_text_only_batch(db: Session, source_item_ids: list[str]) -> int:
+    claimed = _claim_batch(db, source_item_ids)
+    recapturable = _ids_with_html(db, [entry.id for entry in claimed if entry.fetch_headers])
+    created = 0
+    for entry in claimed:
+        validators = entry.fetch_headers if entry.id in recapturable else None
+        try:
+            artifact, fresh_validators, head_html = _fetch_html_artifact(
+                entry.id, entry.url, entry.publisher, validators
+            )
+        except CaptureThrottled:
+            entry.item.capture_status = "pending"
+            continue
+        except (requests.RequestException, OSError, ValueError):
+            entry.item.capture_status = "failed"
+            continue
+        if artifact is not None:
+            db.add(artifact)
+            created += 1
+            href = extract_canonical_link(head_html, entry.url)
+            backfill_canonical_url(db, entry.id, href)
+        entry.item.fetch_headers = fresh_validators
+        entry.item.capture_status = "captured"
+    db.commit()
+    return created
+
+
+def capture_source_item_batch(
+    db: Session, source_item_ids: list[str], pool: BrowserPool
+) -> int:
+    profile = get_interception_profile()
+    created = 0
+    for entry in _claim_batch(db, source_item_ids):
+        try:
+            payloads, canonical_href = _render_page(pool, entry.url, profile)
+            artifacts = write_page_artifacts(
+                entry.id, entry.publisher, payloads, profile.tool_version
+            )
+        except CaptureThrottled:
+            entry.item.capture_status = "pending"
+            continue
+        except (PlaywrightError, OSError, ValueError):
+            entry.item.capture_status = "failed"
+            continue
+        db.add_all(artifacts)
+        backfill_canonical_url(db, entry.id, canonical_href)
+        entry.item.capture_status = "captured"
+        created += len(artifacts)
+    db.commit()
+    return created
+
+
+def capture_adaptive_batch(
+    db: Session, source_item_ids: list[str], pool: BrowserPool
+) -> int:
+    created = 0
+    for source_item_id in source_item_ids:
+        try:
+            created += capture_adaptive(db, source_item_id, pool)
+        except CaptureThrottled:
+            db.get(SourceItem, source_item_id).capture_status = "pending"
+            db.commit()
+        except (requests.RequestException, PlaywrightError, OSError, ValueError):
+            db.rollback()
+            source_item = db.get(SourceItem, source_item_id)
+            if source_item is not None:
+                source_item.capture_status = "failed"
+                db.commit()
+    return created
 
 
 def capture_text_only_job(source_item_id: str) -> int:
-    engine = init_engine()
+    get_worker_engine()
     db = SessionLocal()
     try:
         return capture_text_only(db, source_item_id)
     finally:
         db.close()
-        engine.dispose()
 
 
 def capture_source_item_job(source_item_id: str) -> int:
-    engine = init_engine()
+    get_worker_engine()
+    db = SessionLocal()
+    try:
+        return capture_source_item(db, source_item_id, get_browser_pool())
+    finally:
+        db.close()
+
+
+def capture_adaptive_job(source_item_id: str) -> int:
+    get_worker_engine()
+    db = SessionLocal()
+    try:
+        return capture_adaptive(db, source_item_id, get_browser_pool())
+    finally:
+        db.close()
+
+
+def capture_text_only_batch_job(source_item_ids: list[str]) -> int:
+    get_worker_engine()
+    db = SessionLocal()
+    try:
+        return capture_text_only_batch(db, source_item_ids)
+    finally:
+        db.close()
+
+
+def capture_source_item_batch_job(source_item_ids: list[str]) -> int:
+    get_worker_engine()
+    db = SessionLocal()
+    try:
+        return capture_source_item_batch(db, source_item_ids, get_browser_pool())
+    finally:
+        db.close()
+
+
+def capture_adaptive_batch_job(source_item_ids: list[str]) -> int:
+    get_worker_engine()
     db = SessionLocal()
     try:
-        return capture_source_item(db, source_item_id)
+        return capture_adaptive_batch(db, source_item_ids, get_browser_pool())
     finally:
         db.close()
-        engine.dispose()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import html as html_lib
+import re
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import PublisherCapturePolicy
+from app.settings import get_shell_min_text_chars
+from app.text_utils import normalize_text
+
+ESCALATE_AFTER = 3
+REPROBE_EVERY = 25
+
+_SHELL_MARKERS = (
+    "enable javascript",
+    "javascript is disabled",
+    "javascript is required",
+    "please enable js",
+)
+_PAYWALL_RE = re.compile(
+    r"\"isAccessibleForFree\"\s*:\s*\"?false\b"
+    r"|\b(?:class|id)\s*=\s*[\"'](?:[^\"']*\s)?paywall[\w-]*[\s\"']"
+    r"|\bdata-paywall\b",
+    re.IGNORECASE,
+)
+_HIDDEN_BLOCK_RE = re.compile(
+    r"<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def visible_text(raw_html: str) -> str:
+    stripped = _HIDDEN_BLOCK_RE.sub(" ", raw_html)
+    stripped = _TAG_RE.sub(" ", stripped)
+    return normalize_text(html_lib.unescape(stripped))
+
+
+def looks_like_shell(raw_html: str) -> bool:
+    if _PAYWALL_RE.search(raw_html):
+        return True
+    text = visible_text(raw_html)
+    lowered = text.lower()
+    if any(marker in lowered for marker in _SHELL_MARKERS):
+        return True
+    return len(text) < get_shell_min_text_chars()
+
+
+def _policy_key(publisher: str | None) -> str:
+    return (publisher or "unknown").strip()[:255] or "unknown"
+
+
+def get_policy(db: Session, publisher: str | None) -> PublisherCapturePolicy:
+    key = _policy_key(publisher)
+    policy = db.get(PublisherCapturePolicy, key)
+    if policy is None:
+        db.execute(
+            insert(PublisherCapturePolicy)
+            .values(publisher=key)
+            .on_conflict_do_nothing(index_elements=["publisher"])
+        )
+        policy = db.get(PublisherCapturePolicy, key)
+    return policy
+
+
+def choose_method(policy: PublisherCapturePolicy) -> str:
+    if policy.preferred_method != "browser":
+        return "http"
+    attempts = policy.http_successes + policy.browser_captures
+    return "http" if attempts % REPROBE_EVERY == 0 else "browser"
+
+
+def record_outcome(policy: PublisherCapturePolicy, method: str, escalated: bool) -> None:
+    if method == "http" and not escalated:
+        policy.http_successes += 1
+        policy.consecutive_escalations = 0
+        policy.preferred_method = "http"
+        return
+    policy.browser_captures += 1
+    if escalated:
+        policy.consecutive_escalations += 1
+        if policy.consecutive_escalations >= ESCALATE_AFTER:
+            policy.preferred_method = "browser"
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from app.settings import get_capture_block_domains, get_capture_profile, get_capture_settle_ms
+
+AD_TRACKER_DOMAINS = frozenset(
+    {
+        "adnxs.com",
+        "adsafeprotected.com",
+        "adservice.google.com",
+        "amazon-adsystem.com",
+        "chartbeat.com",
+        "chartbeat.net",
+        "criteo.com",
+        "criteo.net",
+        "doubleclick.net",
+        "facebook.net",
+        "google-analytics.com",
+        "googlesyndication.com",
+        "googletagmanager.com",
+        "googletagservices.com",
+        "hotjar.com",
+        "moatads.com",
+        "nr-data.net",
+        "outbrain.com",
+        "pubmatic.com",
+        "quantserve.com",
+        "rubiconproject.com",
+        "scorecardresearch.com",
+        "segment.io",
+        "taboola.com",
+    }
+)
+HEAVY_RESOURCE_TYPES = frozenset({"media", "font"})
+
+
+@dataclass(frozen=True)
+class InterceptionProfile:
+    name: str
+    blocked_domains: frozenset[str] = frozenset()
+    blocked_resource_types: frozenset[str] = frozenset()
+    wait_until: str = "domcontentloaded"
+    settle_ms: int = 0
+
+    @property
+    def intercepts(self) -> bool:
+        return bool(self.blocked_domains or self.blocked_resource_types)
+
+    @property
+    def tool_version(self) -> str:
+        return f"playwright-python;profile={self.name}"
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = (urlsplit(url).hostname or "").lower()
+        while host:
+            if host in self.blocked_domains:
+                return True
+            _, _, host = host.partition(".")
+        return False
+
+
+def get_interception_profile(name: str | None = None) -> InterceptionProfile:
+    name = name or get_capture_profile()
+    if name == "none":
+        return InterceptionProfile(name="none", wait_until="networkidle")
+    domains = AD_TRACKER_DOMAINS | frozenset(get_capture_block_domains())
+    settle_ms = get_capture_settle_ms()
+    if name == "lean":
+        return InterceptionProfile(
+            name="lean",
+            blocked_domains=domains,
+            blocked_resource_types=HEAVY_RESOURCE_TYPES,
+            settle_ms=settle_ms,
+        )
+    if name == "ads":
+        return InterceptionProfile(name="ads", blocked_domains=domains, settle_ms=settle_ms)
+    raise ValueError(f"unknown capture profile: {name}")
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from rq import Queue
+from rq.job import Job, JobStatus
+from sqlalchemy import String, column, or_, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.models import SourceItem
+from app.queue import get_queue
+from app.scheduler import HostScheduler
+from app.settings import get_capture_queued_grace_seconds
+
+PENDING_PAGE_ROWS = 1000
+CAPTURE_JOBS = {
+    "browser": "app.capture.capture_source_item_job",
+    "text": "app.capture.capture_text_only_job",
+    "adaptive": "app.capture.capture_adaptive_job",
+}
+CAPTURE_BATCH_JOBS = {
+    "browser": "app.capture.capture_source_item_batch_job",
+    "text": "app.capture.capture_text_only_batch_job",
+    "adaptive": "app.capture.capture_adaptive_batch_job",
+}
+LIVE_JOB_STATUSES = frozenset(
+    {JobStatus.QUEUED, JobStatus.STARTED, JobStatus.DEFERRED, JobStatus.SCHEDULED}
+)
+
+
+class CaptureHandoff:
+    def __init__(
+        self,
+        method: str = "browser",
+        polite: bool = False,
+        batch_size: int = 1,
+        queue: Queue | None = None,
+    ) -> None:
+        if method not in CAPTURE_JOBS:
+            raise ValueError(f"unknown capture method: {method}")
+        if polite and batch_size > 1:
+            raise ValueError("polite dispatch captures one item per job; drop --batch-size")
+        self.method = method
+        self.polite = polite
+        self.batch_size = max(1, batch_size)
+        self.job = CAPTURE_BATCH_JOBS[method] if self.batch_size > 1 else CAPTURE_JOBS[method]
+        self.queue = queue or get_queue()
+        self.scheduler = HostScheduler(redis=self.queue.connection)
+
+    def __call__(self, db: Session, items: list[tuple[str, str]]) -> int:
+        if not items:
+            return 0
+        if self.polite:
+            return self.scheduler.schedule(items, self.method)
+        ids = [source_item_id for source_item_id, _ in items]
+        batches = [
+            ids[start : start + self.batch_size] for start in range(0, len(ids), self.batch_size)
+        ]
+        job_ids = [str(uuid.uuid4()) for _ in batches]
+        with self.queue.connection.pipeline() as pipeline:
+            self.queue.enqueue_many(
+                [
+                    Queue.prepare_data(
+                        self.job, (batch if self.batch_size > 1 else batch[0],), job_id=job_id
+                    )
+                    for batch, job_id in zip(batches, job_ids)
+                ],
+                pipeline=pipeline,
+            )
+            pipeline.execute()
+        _record_job_ids(
+            db,
+            [
+                (source_item_id, job_id)
+                for batch, job_id in zip(batches, job_ids)
+                for source_item_id in batch
+            ],
+        )
+        return len(items)
+
+    def lost(self, items: list[tuple[str, str, str | None]]) -> list[str]:
+        enqueued = [(source_item_id, job_id) for source_item_id, _, job_id in items if job_id]
+        jobs = Job.fetch_many([job_id for _, job_id in enqueued], connection=self.queue.connection)
+        lost = [
+            source_item_id
+            for (source_item_id, _), job in zip(enqueued, jobs)
+            if job is None or job.get_status(refresh=False) not in LIVE_JOB_STATUSES
+        ]
+        scheduled = [(source_item_id, url) for source_item_id, url, job_id in items if not job_id]
+        if scheduled:
+            alive = self.scheduler.scheduled(scheduled)
+            lost.extend(
+                source_item_id for source_item_id, _ in scheduled if source_item_id not in alive
+            )
+        return lost
+
+
+def _record_job_ids(db: Session, pairs: list[tuple[str, str]]) -> None:
+    if not pairs:
+        return
+    job_ids = values(
+        column("id", UUID(as_uuid=True)), column("job_id", String), name="job_ids"
+    ).data([(uuid.UUID(source_item_id), job_id) for source_item_id, job_id in pairs])
+    db.execute(
+        update(SourceItem)
+        .where(SourceItem.id == job_ids.c.id)
+        .values(capture_job_id=job_ids.c.job_id)
+    )
+
+
+def _claimed(db: Session, stmt) -> list:
+    rows = db.execute(
+        stmt.values(capture_status="queued", queued_at=func.now(), capture_job_id=None).returning(
+            SourceItem.id, SourceItem.url, SourceItem.discovered_at
+        )
+    ).all()
+    rows.sort(key=lambda row: (row.discovered_at, row.id))
+    return rows
+
+
+def claim_source_items(db: Session, source_item_ids: list[str]) -> list[tuple[str, str]]:
+    if not source_item_ids:
+        return []
+    stmt = (
+        update(SourceItem)
+        .where(SourceItem.id.in_(source_item_ids))
+        .where(SourceItem.capture_status == "pending")
+    )
+    return [(str(row.id), row.url) for row in _claimed(db, stmt)]
+
+
+def requeue_lost(
+    db: Session,
+    handoff: CaptureHandoff,
+    page_size: int = PENDING_PAGE_ROWS,
+    grace_seconds: int | None = None,
+) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=grace_seconds if grace_seconds is not None else get_capture_queued_grace_seconds()
+    )
+    requeued = 0
+    cursor = None
+    while True:
+        query = (
+            select(SourceItem.id, SourceItem.url, SourceItem.capture_job_id)
+            .where(SourceItem.capture_status == "queued")
+            .where(or_(SourceItem.queued_at.is_(None), SourceItem.queued_at < cutoff))
+            .order_by(SourceItem.id)
+            .limit(page_size)
+        )
+        if cursor is not None:
+            query = query.where(SourceItem.id > cursor)
+        rows = db.execute(query).all()
+        if not rows:
+            break
+        cursor = rows[-1].id
+        lost = handoff.lost([(str(row.id), row.url, row.capture_job_id) for row in rows])
+        if lost:
+            requeued += db.execute(
+                update(SourceItem)
+                .where(SourceItem.id.in_(lost))
+                .where(SourceItem.capture_status == "queued")
+                .values(capture_status="pending", queued_at=None, capture_job_id=None)
+            ).rowcount
+        db.commit()
+    return requeued
+
+
+def enqueue_pending(
+    db: Session,
+    handoff: CaptureHandoff,
+    page_size: int = PENDING_PAGE_ROWS,
+    grace_seconds: int | None = None,
+) -> int:
+    requeue_lost(db, handoff, page_size, grace_seconds)
+    handed = 0
+    cursor = None
+    while True:
+        candidates = (
+            select(SourceItem.id)
+            .where(SourceItem.capture_status == "pending")
+            .where(SourceItem.is_filtered.is_(False))
+            .order_by(SourceItem.discovered_at, SourceItem.id)
+            .limit(page_size)
+            .with_for_update(skip_locked=True)
+        )
+        if cursor is not None:
+            candidates = candidates.where(
+                tuple_(SourceItem.discovered_at, SourceItem.id) > tuple_(*cursor)
+            )
+        rows = _claimed(db, update(SourceItem).where(SourceItem.id.in_(candidates)))
+        if not rows:
+            break
+        cursor = (rows[-1].discovered_at, rows[-1].id)
+        handed += handoff(db, [(str(row.id), row.url) for row in rows])
+        db.commit()
+    return handed
@@ -16,6 +16,16 @@ def init_engine():
     return engine
 
 
+_worker_engine = None
+
+
+def get_worker_engine():
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = init_engine()
+    return _worker_engine
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     engine = init_engine()
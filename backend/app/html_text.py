@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import codecs
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Iterable
+
+from app.storage import iter_blob
+
+SKIP_TAGS = frozenset("script style noscript template svg iframe canvas object".split())
+HEAD_TAGS = frozenset("base link meta noscript script style template title".split())
+BOILERPLATE_TAGS = frozenset("nav header footer aside form button select".split())
+BOILERPLATE_ROLES = frozenset("navigation banner contentinfo complementary search".split())
+MAIN_TAGS = frozenset({"article", "main"})
+STRUCTURAL_TAGS = frozenset({"html", "body", "main", "article"})
+BLOCK_TAGS = frozenset(
+    "address article blockquote br dd div dl dt figcaption h1 h2 h3 h4 h5 h6 hr li main ol p "
+    "pre section table td th tr ul".split()
+)
+VOID_TAGS = frozenset("area base br col embed hr img input link meta param source track wbr".split())
+MIN_MAIN_TEXT_CHARS = 200
+MIN_KEPT_TEXT_RATIO = 0.1
+BOILERPLATE_WORDS = frozenset(
+    "nav navbar menu footer sidebar cookie cookies consent share sharing social related comment "
+    "comments promo advert ad ads newsletter subscribe breadcrumb breadcrumbs banner popup modal "
+    "masthead".split()
+)
+_ATTR_SEPARATOR_RE = re.compile(r"[-_]")
+
+
+def _is_boilerplate_token(token: str) -> bool:
+    return _ATTR_SEPARATOR_RE.split(token, maxsplit=1)[0] in BOILERPLATE_WORDS
+
+
+def _is_boilerplate(attrs: list[tuple[str, str | None]]) -> bool:
+    for name, value in attrs:
+        if name == "hidden" or (name == "aria-hidden" and value == "true"):
+            return True
+        if not value:
+            continue
+        if name == "role" and value in BOILERPLATE_ROLES:
+            return True
+        if name in ("class", "id"):
+            if any(_is_boilerplate_token(token) for token in value.lower().split()):
+                return True
+    return False
+
+
+class _MainTextParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._stack: list[tuple[str, bool, bool, bool]] = []
+        self._open = Counter()
+        self._hidden_depth = 0
+        self._skip_depth = 0
+        self._main_depth = 0
+        self.full_parts: list[str] = []
+        self.page_parts: list[str] = []
+        self.main_parts: list[str] = []
+
+    def _break(self) -> None:
+        self.full_parts.append("\n")
+        self.page_parts.append("\n")
+        if self._main_depth:
+            self.main_parts.append("\n")
+
+    def _close(self, tag: str) -> None:
+        while self._stack:
+            open_tag, hidden, skip, main = self._stack.pop()
+            self._open[open_tag] -= 1
+            self._hidden_depth -= hidden
+            self._skip_depth -= skip
+            self._main_depth -= main
+            if open_tag == tag:
+                break
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self._open["head"] and tag not in HEAD_TAGS:
+            self._close("head")
+        if tag in BLOCK_TAGS:
+            self._break()
+        if tag in VOID_TAGS:
+            return
+        hidden = tag in SKIP_TAGS or tag == "head"
+        skip = hidden or tag in BOILERPLATE_TAGS
+        if not skip and not self._skip_depth and attrs and tag not in STRUCTURAL_TAGS:
+            skip = _is_boilerplate(attrs)
+        main = tag in MAIN_TAGS
+        self._stack.append((tag, hidden, skip, main))
+        self._open[tag] += 1
+        self._hidden_depth += hidden
+        self._skip_depth += skip
+        self._main_depth += main
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in BLOCK_TAGS:
+            self._break()
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self._open[tag]:
+            return
+        self._close(tag)
+        if tag in BLOCK_TAGS:
+            self._break()
+
+    def handle_data(self, data: str) -> None:
+        if self._hidden_depth:
+            return
+        self.full_parts.append(data)
+        if self._skip_depth:
+            return
+        self.page_parts.append(data)
+        if self._main_depth:
+            self.main_parts.append(data)
+
+
+def _collapse(parts: list[str]) -> str:
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def extract_main_text_chunks(chunks: Iterable[str]) -> str:
+    parser = _MainTextParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+    full_text = _collapse(parser.full_parts)
+    floor = max(1, len(full_text) * MIN_KEPT_TEXT_RATIO)
+    main_text = _collapse(parser.main_parts)
+    if len(main_text) >= max(MIN_MAIN_TEXT_CHARS, floor):
+        return main_text
+    page_text = _collapse(parser.page_parts)
+    if len(page_text) >= floor:
+        return page_text
+    return full_text
+
+
+def extract_main_text(html: str) -> str:
+    return extract_main_text_chunks([html])
+
+
+def extract_main_text_from_blob(path: str) -> str:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+
+    def decoded() -> Iterable[str]:
+        for chunk in iter_blob(path):
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+
+    return extract_main_text_chunks(decoded())
@@ -0,0 +1,19 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.settings import get_http_pool_size
+
+_session: requests.Session | None = None
+
+
+def get_http_session() -> requests.Session:
+    global _session
+    if _session is None:
+        pool_size = get_http_pool_size()
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        _session = session
+    return _session
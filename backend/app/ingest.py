@@ -1,37 +1,68 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable, Iterator
 
 import feedparser
+import requests
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from app.models import SourceItem
-from app.significance import is_significant
+from app.canonical import canonicalize_url
+from app.http_client import get_http_session
+from app.models import FeedState, SourceItem
+from app.settings import (
+    get_feed_max_interval,
+    get_feed_min_interval,
+    get_feed_timeout,
+    get_feed_workers,
+)
+from app.significance import classify_many
+
+
+MAX_SEEN_ENTRY_IDS = 500
+INSERT_CHUNK_ROWS = 1000
+STREAM_CHUNK_LINES = 10000
 
 
 @dataclass
 class IngestResult:
     created: int
     skipped: int
+    created_items: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class StreamCheckpoint:
+    offset: int = 0
+    created: int = 0
+    skipped: int = 0
+
+
+def _iter_lines(path: str, offset: int = 0) -> Iterator[tuple[int, str]]:
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        for raw in handle:
+            offset += len(raw)
+            stripped = raw.decode("utf-8", errors="ignore").strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            yield offset, stripped
 
 
 def _load_lines(path: str) -> list[str]:
-    file_path = Path(path)
-    if not file_path.exists():
+    if not Path(path).exists():
         return []
-    lines: list[str] = []
-    for line in file_path.read_text(encoding="utf-8").splitlines():
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-        lines.append(stripped)
-    return lines
+    return [line for _, line in _iter_lines(path)]
 
 
 def _parse_datetime(value: str | None) -> datetime | None:
@@ -43,80 +74,304 @@ def _parse_datetime(value: str | None) -> datetime | None:
         return None
 
 
-def _source_item_exists(db: Session, url: str) -> bool:
-    stmt = select(SourceItem.id).where(SourceItem.url == url)
-    return db.execute(stmt).scalar_one_or_none() is not None
+def _source_item_row(url: str, **fields) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "url": url,
+        "canonical_url": canonicalize_url(url),
+        "title": None,
+        "publisher": None,
+        "published_at": None,
+        "discovered_at": datetime.utcnow(),
+        "capture_tier": 1,
+        "capture_status": "pending",
+        "is_significant": True,
+        "is_filtered": False,
+        **fields,
+    }
 
 
-def ingest_urls(db: Session, urls: Iterable[str]) -> IngestResult:
-    created = 0
-    skipped = 0
-    for url in urls:
-        if _source_item_exists(db, url):
-            skipped += 1
+def insert_source_items(db: Session, rows: Iterable[dict]) -> IngestResult:
+    unique_rows: dict[str, dict] = {}
+    duplicates = 0
+    for row in rows:
+        if row["canonical_url"] in unique_rows:
+            duplicates += 1
             continue
-        db.add(
-            SourceItem(
-                url=url,
-                canonical_url=url,
-                discovered_at=datetime.utcnow(),
-                capture_tier=1,
-                capture_status="pending",
-                is_significant=True,
-                is_filtered=False,
-            )
+        unique_rows[row["canonical_url"]] = row
+
+    batch = list(unique_rows.values())
+    created_items: list[tuple[str, str]] = []
+    for start in range(0, len(batch), INSERT_CHUNK_ROWS):
+        stmt = (
+            insert(SourceItem)
+            .values(batch[start : start + INSERT_CHUNK_ROWS])
+            .on_conflict_do_nothing(index_elements=["canonical_url"])
+            .returning(SourceItem.id, SourceItem.url)
         )
-        created += 1
+        created_items.extend((str(item_id), url) for item_id, url in db.execute(stmt).all())
+    created = len(created_items)
+    return IngestResult(
+        created=created, skipped=len(batch) - created + duplicates, created_items=created_items
+    )
+
+
+def ingest_urls(db: Session, urls: Iterable[str]) -> IngestResult:
+    result = insert_source_items(db, (_source_item_row(url) for url in urls))
     db.commit()
-    return IngestResult(created=created, skipped=skipped)
+    return result
 
 
 def ingest_urls_from_file(db: Session, path: str) -> IngestResult:
     return ingest_urls(db, _load_lines(path))
 
 
-def ingest_rss(db: Session, feed_urls: Iterable[str]) -> IngestResult:
-    created = 0
-    skipped = 0
-    for feed_url in feed_urls:
-        feed = feedparser.parse(feed_url)
-        publisher = getattr(feed.feed, "title", None)
-        for entry in feed.entries:
-            url = getattr(entry, "link", None)
-            if not url:
-                continue
-            categories = [
+def _read_checkpoint(path: str) -> StreamCheckpoint:
+    checkpoint_path = Path(path)
+    if not checkpoint_path.exists():
+        return StreamCheckpoint()
+    return StreamCheckpoint(**json.loads(checkpoint_path.read_text(encoding="utf-8")))
+
+
+def _write_checkpoint(path: str, checkpoint: StreamCheckpoint) -> None:
+    tmp_path = f"{path}.tmp"
+    Path(tmp_path).write_text(json.dumps(asdict(checkpoint)), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def ingest_urls_streaming(
+    db: Session,
+    path: str,
+    chunk_size: int = STREAM_CHUNK_LINES,
+    checkpoint_path: str | None = None,
+    on_progress: Callable[[StreamCheckpoint], None] | None = None,
+) -> IngestResult:
+    checkpoint_path = checkpoint_path or f"{path}.checkpoint.json"
+    checkpoint = _read_checkpoint(checkpoint_path)
+    if checkpoint.offset > os.path.getsize(path):
+        checkpoint = StreamCheckpoint()
+
+    def flush(urls: list[str], offset: int) -> None:
+        result = insert_source_items(db, (_source_item_row(url) for url in urls))
+        db.commit()
+        checkpoint.offset = offset
+        checkpoint.created += result.created
+        checkpoint.skipped += result.skipped
+        _write_checkpoint(checkpoint_path, checkpoint)
+        if on_progress is not None:
+            on_progress(checkpoint)
+
+    chunk: list[str] = []
+    offset = checkpoint.offset
+    for offset, url in _iter_lines(path, checkpoint.offset):
+        chunk.append(url)
+        if len(chunk) >= chunk_size:
+            flush(chunk, offset)
+            chunk = []
+    if chunk:
+        flush(chunk, offset)
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return IngestResult(created=checkpoint.created, skipped=checkpoint.skipped)
+
+
+@dataclass
+class FeedEntry:
+    url: str
+    title: str | None
+    publisher: str | None
+    published_at: datetime | None
+
+
+@dataclass(frozen=True)
+class FeedValidators:
+    etag: str | None = None
+    last_modified: str | None = None
+    seen_entry_ids: frozenset[str] = frozenset()
+
+
+@dataclass
+class ParsedFeed:
+    entries: list[FeedEntry]
+    skipped: int
+    not_modified: bool = False
+    failed: bool = False
+    etag: str | None = None
+    last_modified: str | None = None
+    entry_ids: list[str] = field(default_factory=list)
+    new_entries: int = 0
+
+
+def _fetch_feed(
+    feed_url: str, timeout: float, validators: FeedValidators
+) -> feedparser.FeedParserDict | None:
+    if not feed_url.startswith(("http://", "https://")):
+        return feedparser.parse(feed_url)
+    headers = {}
+    if validators.etag:
+        headers["If-None-Match"] = validators.etag
+    if validators.last_modified:
+        headers["If-Modified-Since"] = validators.last_modified
+    response = get_http_session().get(feed_url, timeout=timeout, headers=headers)
+    if headers and response.status_code == 304:
+        return None
+    response.raise_for_status()
+    response_headers = {key.lower(): value for key, value in response.headers.items()}
+    return feedparser.parse(response.content, response_headers=response_headers)
+
+
+def parse_feed(
+    feed_url: str, timeout: float | None = None, validators: FeedValidators | None = None
+) -> ParsedFeed:
+    validators = validators or FeedValidators()
+    try:
+        feed = _fetch_feed(feed_url, timeout or get_feed_timeout(), validators)
+    except requests.RequestException:
+        return ParsedFeed(entries=[], skipped=0, failed=True)
+    if feed is None:
+        return ParsedFeed(
+            entries=[],
+            skipped=0,
+            not_modified=True,
+            etag=validators.etag,
+            last_modified=validators.last_modified,
+            entry_ids=sorted(validators.seen_entry_ids),
+        )
+
+    headers = getattr(feed, "headers", {}) or {}
+    parsed = ParsedFeed(
+        entries=[],
+        skipped=0,
+        etag=headers.get("etag"),
+        last_modified=headers.get("last-modified"),
+    )
+    publisher = getattr(feed.feed, "title", None)
+    candidates = []
+    for entry in feed.entries:
+        url = getattr(entry, "link", None)
+        if not url:
+            continue
+        entry_id = getattr(entry, "id", None) or url
+        parsed.entry_ids.append(entry_id)
+        if entry_id in validators.seen_entry_ids:
+            parsed.skipped += 1
+            continue
+        parsed.new_entries += 1
+        candidates.append((url, entry))
+
+    matches = classify_many(
+        (
+            [
                 str(tag.get("term", "")).strip()
                 for tag in getattr(entry, "tags", []) or []
                 if isinstance(tag, dict)
-            ]
-            title = getattr(entry, "title", "") or ""
-            summary = getattr(entry, "summary", "") or getattr(entry, "description", "") or ""
-            if not is_significant(categories, title, summary):
-                skipped += 1
-                continue
-            if _source_item_exists(db, url):
-                skipped += 1
-                continue
-            published_at = _parse_datetime(getattr(entry, "published", None))
-            db.add(
-                SourceItem(
-                    url=url,
-                    canonical_url=url,
-                    title=getattr(entry, "title", None),
-                    publisher=publisher,
-                    published_at=published_at,
-                    discovered_at=datetime.utcnow(),
-                    capture_tier=1,
-                    capture_status="pending",
-                    is_significant=True,
-                    is_filtered=False,
+            ],
+            getattr(entry, "title", "") or "",
+            getattr(entry, "summary", "") or getattr(entry, "description", "") or "",
+        )
+        for _, entry in candidates
+    )
+    for (url, entry), match in zip(candidates, matches):
+        if not match.significant:
+            parsed.skipped += 1
+            continue
+        parsed.entries.append(
+            FeedEntry(
+                url=url,
+                title=getattr(entry, "title", None),
+                publisher=publisher,
+                published_at=_parse_datetime(getattr(entry, "published", None)),
+            )
+        )
+    return parsed
+
+
+def _validators_for(state: FeedState | None) -> FeedValidators:
+    if state is None:
+        return FeedValidators()
+    return FeedValidators(
+        etag=state.etag,
+        last_modified=state.last_modified,
+        seen_entry_ids=frozenset(state.seen_entry_ids or []),
+    )
+
+
+def _update_feed_state(state: FeedState, parsed: ParsedFeed, now: datetime) -> None:
+    interval = state.poll_interval_seconds or get_feed_min_interval()
+    state.last_fetched_at = now
+    if parsed.failed:
+        state.next_fetch_at = now + timedelta(seconds=interval)
+        return
+    if parsed.new_entries:
+        interval = max(get_feed_min_interval(), interval // 2)
+        state.last_changed_at = now
+    else:
+        interval = min(get_feed_max_interval(), int(interval * 1.5))
+    if not parsed.not_modified:
+        state.etag = parsed.etag
+        state.last_modified = parsed.last_modified
+        state.seen_entry_ids = parsed.entry_ids[:MAX_SEEN_ENTRY_IDS]
+    state.poll_interval_seconds = interval
+    state.next_fetch_at = now + timedelta(seconds=interval)
+
+
+def ingest_rss(
+    db: Session,
+    feed_urls: Iterable[str],
+    workers: int | None = None,
+    timeout: float | None = None,
+    force: bool = False,
+) -> IngestResult:
+    feed_urls = list(dict.fromkeys(feed_urls))
+    now = datetime.now(timezone.utc)
+    states = {
+        state.feed_url: state
+        for state in db.execute(select(FeedState).where(FeedState.feed_url.in_(feed_urls)))
+        .scalars()
+        .all()
+    }
+    due = [
+        feed_url
+        for feed_url in feed_urls
+        if force
+        or feed_url not in states
+        or states[feed_url].next_fetch_at is None
+        or states[feed_url].next_fetch_at <= now
+    ]
+
+    rows: list[dict] = []
+    skipped = 0
+    with ThreadPoolExecutor(max_workers=workers or get_feed_workers()) as executor:
+        futures = [
+            executor.submit(parse_feed, feed_url, timeout, _validators_for(states.get(feed_url)))
+            for feed_url in due
+        ]
+        for feed_url, future in zip(due, futures):
+            parsed = future.result()
+            state = states.get(feed_url)
+            if state is None:
+                state = FeedState(feed_url=feed_url)
+                db.add(state)
+            _update_feed_state(state, parsed, datetime.now(timezone.utc))
+            skipped += parsed.skipped
+            rows.extend(
+                _source_item_row(
+                    entry.url,
+                    title=entry.title,
+                    publisher=entry.publisher,
+                    published_at=entry.published_at,
                 )
+                for entry in parsed.entries
             )
-            created += 1
+    inserted = insert_source_items(db, rows)
     db.commit()
-    return IngestResult(created=created, skipped=skipped)
+    return IngestResult(
+        created=inserted.created,
+        skipped=skipped + inserted.skipped,
+        created_items=inserted.created_items,
+    )
 
 
-def ingest_rss_from_file(db: Session, path: str) -> IngestResult:
-    return ingest_rss(db, _load_lines(path))
+def ingest_rss_from_file(db: Session, path: str, force: bool = False) -> IngestResult:
+    return ingest_rss(db, _load_lines(path), force=force)
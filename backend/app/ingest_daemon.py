@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import signal
+import threading
+import time
+from typing import Callable
+
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.capture_queue import claim_source_items
+from app.db import SessionLocal, get_worker_engine
+from app.ingest import _load_lines, ingest_rss, ingest_urls
+from app.settings import get_ingest_sweep_seconds, get_ingest_watch_seconds
+
+
+class WatchedFile:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lines: list[str] = []
+        self._stamp: tuple[int, int] | None = None
+
+    def _current_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self) -> list[str] | None:
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        previous = set(self.lines)
+        self.lines = _load_lines(self.path)
+        return [line for line in self.lines if line not in previous]
+
+
+class IngestDaemon:
+    def __init__(
+        self,
+        rss_path: str,
+        urls_path: str,
+        handoff: Callable[[Session, list[tuple[str, str]]], int],
+        sweep_seconds: float | None = None,
+        watch_seconds: float | None = None,
+    ) -> None:
+        self.feeds = WatchedFile(rss_path)
+        self.urls = WatchedFile(urls_path)
+        self.handoff = handoff
+        self.sweep_seconds = sweep_seconds or get_ingest_sweep_seconds()
+        self.watch_seconds = watch_seconds or get_ingest_watch_seconds()
+        self._stop = threading.Event()
+        self._next_sweep = 0.0
+
+    def stop(self, *_args) -> None:
+        self._stop.set()
+
+    def _hand_off(self, db: Session, items: list[tuple[str, str]]) -> int:
+        claimed = claim_source_items(db, [source_item_id for source_item_id, _ in items])
+        handed = self.handoff(db, claimed)
+        db.commit()
+        return handed
+
+    def tick(self, db: Session) -> None:
+        new_urls = self.urls.refresh()
+        if new_urls:
+            result = ingest_urls(db, new_urls)
+            handed = self._hand_off(db, result.created_items)
+            print(
+                f"URL: created={result.created} skipped={result.skipped} queued={handed}",
+                flush=True,
+            )
+
+        feeds_changed = self.feeds.refresh() is not None
+        now = time.monotonic()
+        if self.feeds.lines and (feeds_changed or now >= self._next_sweep):
+            self._next_sweep = now + self.sweep_seconds
+            result = ingest_rss(db, self.feeds.lines)
+            handed = self._hand_off(db, result.created_items)
+            if result.created:
+                print(
+                    f"RSS: created={result.created} skipped={result.skipped} queued={handed}",
+                    flush=True,
+                )
+
+    def run(self) -> None:
+        get_worker_engine()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                self.tick(db)
+            except (SQLAlchemyError, RedisError, OSError) as exc:
+                db.rollback()
+                print(f"Ingest tick failed: {exc}", flush=True)
+            finally:
+                db.close()
+            self._stop.wait(self.watch_seconds)
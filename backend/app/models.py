@@ -1,7 +1,17 @@
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 
@@ -13,7 +23,8 @@ class SourceItem(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     url = Column(Text, nullable=False)
-    canonical_url = Column(Text, nullable=True)
+    canonical_url = Column(Text, nullable=True, unique=True, index=True)
+    canonical_from_capture = Column(Boolean, nullable=False, default=False, server_default="false")
     title = Column(Text, nullable=True)
     publisher = Column(String(255), nullable=True)
     published_at = Column(DateTime(timezone=True), nullable=True)
@@ -23,19 +34,51 @@ class SourceItem(Base):
     language = Column(String(32), nullable=True)
     capture_tier = Column(Integer, nullable=False, default=1)
     capture_status = Column(String(64), nullable=True)
+    queued_at = Column(DateTime(timezone=True), nullable=True)
+    capture_job_id = Column(String(64), nullable=True)
     is_significant = Column(Boolean, nullable=True)
     is_filtered = Column(Boolean, nullable=False, default=False)
 
     artifacts = relationship("Artifact", back_populates="source_item")
 
+    __table_args__ = (Index("ix_source_items_discovered_at_id", "discovered_at", "id"),)
+
+
+class FeedState(Base):
+    __tablename__ = "feed_states"
+
+    feed_url = Column(Text, primary_key=True)
+    etag = Column(Text, nullable=True)
+    last_modified = Column(Text, nullable=True)
+    seen_entry_ids = Column(JSONB, nullable=True)
+    poll_interval_seconds = Column(Integer, nullable=False, default=900)
+    last_fetched_at = Column(DateTime(timezone=True), nullable=True)
+    last_changed_at = Column(DateTime(timezone=True), nullable=True)
+    next_fetch_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+
+class PublisherCapturePolicy(Base):
+    __tablename__ = "publisher_capture_policies"
+
+    publisher = Column(String(255), primary_key=True)
+    preferred_method = Column(String(16), nullable=False, default="http")
+    http_successes = Column(Integer, nullable=False, default=0)
+    browser_captures = Column(Integer, nullable=False, default=0)
+    consecutive_escalations = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
 
 class Artifact(Base):
     __tablename__ = "artifacts"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    source_item_id = Column(UUID(as_uuid=True), ForeignKey("source_items.id"), nullable=False)
+    source_item_id = Column(
+        UUID(as_uuid=True), ForeignKey("source_items.id"), nullable=False, index=True
+    )
     type = Column(String(32), nullable=False)
-    storage_uri = Column(Text, nullable=False)
+    storage_uri = Column(Text, nullable=False, index=True)
     bytes = Column(Integer, nullable=True)
     sha256 = Column(String(64), nullable=False)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -116,4 +159,10 @@ class NormalizedText(Base):
     canonical_source_item_id = Column(UUID(as_uuid=True), ForeignKey("source_items.id"), nullable=True)
     text_hash = Column(String(64), nullable=False, index=True)
     normalized_text = Column(Text, nullable=False)
+    minhash = Column(ARRAY(Integer), nullable=True)
+    minhash_bands = Column(ARRAY(Integer), nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_normalized_texts_minhash_bands", "minhash_bands", postgresql_using="gin"),
+    )
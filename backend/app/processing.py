@@ -1,13 +1,42 @@
 from __future__ import annotations
 
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from difflib import SequenceMatcher
 from typing import Iterable
 
-from sqlalchemy import select
+from sqlalchemy import Integer, column, select, true, values
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.orm import Session
 
 from app.models import Event, EventMembership, NormalizedText, SourceItem
-from app.text_utils import hash_text, normalize_text
+from app.settings import (
+    get_cluster_member_signatures,
+    get_cluster_window_days,
+    get_near_duplicate_threshold,
+)
+from app.text_utils import hash_text, minhash, minhash_bands, minhash_similarity, normalize_text
+
+
+NEAR_DUPLICATE_CANDIDATES = 200
+NORMALIZED_INSERT_ROWS = 500
+EMPTY_TEXT_HASH = hash_text("")
+
+
+def _find_near_duplicate(db: Session, signature: list[int]) -> NormalizedText | None:
+    candidates = db.execute(
+        select(NormalizedText)
+        .where(NormalizedText.minhash_bands.overlap(minhash_bands(signature)))
+        .order_by(NormalizedText.created_at)
+        .limit(NEAR_DUPLICATE_CANDIDATES)
+    ).scalars()
+    threshold = get_near_duplicate_threshold()
+    for candidate in candidates:
+        if minhash_similarity(candidate.minhash, signature) >= threshold:
+            return candidate
+    return None
 
 
 def upsert_normalized_text(db: Session, source_item: SourceItem, raw_text: str) -> NormalizedText:
@@ -19,28 +48,331 @@ def upsert_normalized_text(db: Session, source_item: SourceItem, raw_text: str)
 
     normalized = normalize_text(raw_text)
     text_hash = hash_text(normalized)
-    canonical = db.execute(
-        select(NormalizedText).where(NormalizedText.text_hash == text_hash)
-    ).scalar_one_or_none()
+    signature = minhash(normalized)
+    canonical = None
+    if normalized:
+        canonical = db.execute(
+            select(NormalizedText)
+            .where(NormalizedText.text_hash == text_hash)
+            .order_by(NormalizedText.created_at)
+            .limit(1)
+        ).scalar_one_or_none()
+    if canonical is None and signature is not None:
+        canonical = _find_near_duplicate(db, signature)
 
     record = NormalizedText(
         source_item_id=source_item.id,
-        canonical_source_item_id=canonical.source_item_id if canonical else None,
+        canonical_source_item_id=(
+            canonical.canonical_source_item_id or canonical.source_item_id if canonical else None
+        ),
         text_hash=text_hash,
         normalized_text=normalized,
+        minhash=signature,
+        minhash_bands=minhash_bands(signature) if signature is not None else None,
     )
     db.add(record)
     db.commit()
     return record
 
 
+@dataclass
+class PreparedText:
+    source_item_id: uuid.UUID
+    normalized_text: str
+    text_hash: str
+    minhash: list[int] | None
+
+
+def prepare_text(source_item_id: uuid.UUID, raw_text: str) -> PreparedText:
+    normalized = normalize_text(raw_text)
+    return PreparedText(source_item_id, normalized, hash_text(normalized), minhash(normalized))
+
+
+@dataclass
+class _KnownText:
+    order: int
+    root: uuid.UUID
+    minhash: list[int] | None
+
+
+class _NearDuplicateBatch:
+    def __init__(self) -> None:
+        self.by_hash: dict[str, uuid.UUID] = {}
+        self.by_band: dict[int, list[_KnownText]] = {}
+        self._order = 0
+
+    def add(
+        self, text_hash: str, root: uuid.UUID, signature: list[int] | None, bands: list[int]
+    ) -> None:
+        if text_hash != EMPTY_TEXT_HASH:
+            self.by_hash.setdefault(text_hash, root)
+        known = _KnownText(self._order, root, signature)
+        self._order += 1
+        for band in bands:
+            self.by_band.setdefault(band, []).append(known)
+
+    def root_for(self, prepared: PreparedText, threshold: float) -> uuid.UUID | None:
+        root = self.by_hash.get(prepared.text_hash)
+        if root is not None or prepared.minhash is None:
+            return root
+        candidates = {
+            known.order: known
+            for band in minhash_bands(prepared.minhash)
+            for known in self.by_band.get(band, ())
+        }
+        for order in sorted(candidates):
+            known = candidates[order]
+            if minhash_similarity(known.minhash, prepared.minhash) >= threshold:
+                return known.root
+        return None
+
+
+def _known_texts_queries(prepared: list[PreparedText]) -> list:
+    columns = (
+        NormalizedText.source_item_id,
+        NormalizedText.canonical_source_item_id,
+        NormalizedText.text_hash,
+        NormalizedText.minhash,
+        NormalizedText.minhash_bands,
+        NormalizedText.created_at,
+    )
+    hashes = {item.text_hash for item in prepared} - {EMPTY_TEXT_HASH}
+    by_hash = (
+        select(*columns)
+        .where(NormalizedText.text_hash.in_(hashes))
+        .distinct(NormalizedText.text_hash)
+        .order_by(NormalizedText.text_hash, NormalizedText.created_at)
+    )
+    probes = [(minhash_bands(item.minhash),) for item in prepared if item.minhash is not None]
+    if not probes:
+        return [by_hash]
+    probe_values = values(column("bands", ARRAY(Integer)), name="probes").data(probes)
+    near = (
+        select(*columns)
+        .where(NormalizedText.minhash_bands.overlap(probe_values.c.bands))
+        .order_by(NormalizedText.created_at)
+        .limit(NEAR_DUPLICATE_CANDIDATES)
+        .lateral("near")
+    )
+    return [by_hash, select(near).select_from(probe_values).join(near, true())]
+
+
+def _known_texts(db: Session, prepared: list[PreparedText]) -> list:
+    rows = {}
+    for query in _known_texts_queries(prepared):
+        for row in db.execute(query):
+            rows.setdefault(row.source_item_id, row)
+    return sorted(rows.values(), key=lambda row: row.created_at)
+
+
+def insert_normalized_texts(db: Session, prepared: list[PreparedText]) -> int:
+    if not prepared:
+        return 0
+    batch = _NearDuplicateBatch()
+    for row in _known_texts(db, prepared):
+        root = row.canonical_source_item_id or row.source_item_id
+        batch.add(row.text_hash, root, row.minhash, row.minhash_bands or [])
+
+    threshold = get_near_duplicate_threshold()
+    rows = []
+    for item in prepared:
+        canonical = batch.root_for(item, threshold)
+        bands = minhash_bands(item.minhash) if item.minhash is not None else None
+        batch.add(item.text_hash, canonical or item.source_item_id, item.minhash, bands or [])
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "source_item_id": item.source_item_id,
+                "canonical_source_item_id": canonical,
+                "text_hash": item.text_hash,
+                "normalized_text": item.normalized_text,
+                "minhash": item.minhash,
+                "minhash_bands": bands,
+            }
+        )
+
+    created = 0
+    for start in range(0, len(rows), NORMALIZED_INSERT_ROWS):
+        stmt = (
+            insert(NormalizedText)
+            .values(rows[start : start + NORMALIZED_INSERT_ROWS])
+            .on_conflict_do_nothing(index_elements=["source_item_id"])
+            .returning(NormalizedText.id)
+        )
+        created += len(db.execute(stmt).all())
+    return created
+
+
 def similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
 
+_WORD_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or over says the to "
+    "was were will with after amid new".split()
+)
+CLUSTER_THRESHOLD = 0.6
+INDEX_PREFIX_CHARS = 4
+REDUNDANT_SIGNATURE_RATIO = 0.85
+
+
+def _index_keys(title: str) -> set[str]:
+    return {
+        word[:INDEX_PREFIX_CHARS]
+        for word in _WORD_RE.findall(title)
+        if len(word) >= 3 and word not in _STOPWORDS
+    }
+
+
+@dataclass
+class _IndexedEvent:
+    event: Event
+    matchers: list[SequenceMatcher] = field(default_factory=list)
+
+
+@dataclass
+class _DayIndex:
+    entries: list[_IndexedEvent] = field(default_factory=list)
+    postings: dict[str, list[int]] = field(default_factory=dict)
+    max_signatures: int = 0
+
+    def add(self, event: Event) -> int:
+        position = len(self.entries)
+        self.entries.append(_IndexedEvent(event))
+        self.add_signature(position, event.title)
+        return position
+
+    def add_signature(self, position: int, title: str) -> None:
+        entry = self.entries[position]
+        lowered = title.lower()
+        if len(entry.matchers) > self.max_signatures or any(
+            matcher.b == lowered for matcher in entry.matchers
+        ):
+            return
+        entry.matchers.append(SequenceMatcher(None, "", lowered))
+        for key in _index_keys(lowered):
+            self.postings.setdefault(key, []).append(position)
+
+    def candidates(self, title: str) -> Iterable[_IndexedEvent]:
+        keys = _index_keys(title)
+        if not keys:
+            return self.entries
+        positions = set()
+        for key in keys:
+            positions.update(self.postings.get(key, ()))
+        return [self.entries[position] for position in sorted(positions)]
+
+
+class EventIndex:
+    def __init__(
+        self,
+        threshold: float = CLUSTER_THRESHOLD,
+        exhaustive: bool = True,
+        window_days: int | None = None,
+        member_signatures: int | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.exhaustive = exhaustive
+        self.window_days = get_cluster_window_days() if window_days is None else window_days
+        self.member_signatures = (
+            get_cluster_member_signatures() if member_signatures is None else member_signatures
+        )
+        self._days: dict[str, _DayIndex] = {}
+        self._positions: dict[uuid.UUID, tuple[str, int]] = {}
+
+    def preload(
+        self,
+        date_key: str,
+        events: Iterable[Event],
+        member_titles: Iterable[tuple[uuid.UUID, str]] = (),
+    ) -> None:
+        day = self._days[date_key] = _DayIndex(max_signatures=self.member_signatures)
+        for event in events:
+            self._positions[event.id] = (date_key, day.add(event))
+        for event_id, title in member_titles:
+            located = self._positions.get(event_id)
+            if located is not None and located[0] == date_key:
+                day.add_signature(located[1], title)
+
+    def _day(self, db: Session, date_key: str) -> _DayIndex:
+        if date_key not in self._days:
+            events = db.execute(select(Event).where(Event.date_key == date_key)).scalars().all()
+            member_titles = []
+            if self.member_signatures:
+                member_titles = db.execute(
+                    select(EventMembership.event_id, SourceItem.title)
+                    .join(SourceItem, SourceItem.id == EventMembership.source_item_id)
+                    .join(Event, Event.id == EventMembership.event_id)
+                    .where(Event.date_key == date_key)
+                    .where(SourceItem.title.is_not(None))
+                    .where(EventMembership.confidence < REDUNDANT_SIGNATURE_RATIO)
+                    .order_by(SourceItem.discovered_at)
+                ).all()
+            self.preload(date_key, events, member_titles)
+        return self._days[date_key]
+
+    def _window(self, date_key: str) -> list[str]:
+        day = datetime.strptime(date_key, "%Y-%m-%d").date()
+        keys = [date_key]
+        for offset in range(1, self.window_days + 1):
+            keys.append((day - timedelta(days=offset)).isoformat())
+            keys.append((day + timedelta(days=offset)).isoformat())
+        return keys
+
+    def add(self, event: Event) -> None:
+        day = self._days.get(event.date_key)
+        if day is not None:
+            self._positions[event.id] = (event.date_key, day.add(event))
+
+    def add_member(self, event: Event, title: str, score: float = 0.0) -> None:
+        located = self._positions.get(event.id)
+        if located is not None and score < REDUNDANT_SIGNATURE_RATIO:
+            date_key, position = located
+            self._days[date_key].add_signature(position, title)
+
+    def best_match(self, db: Session, date_key: str, title: str) -> tuple[Event | None, float]:
+        lowered = title.lower()
+        best_event = None
+        best_score = 0.0
+        bounded = []
+        for window_key in self._window(date_key):
+            day = self._day(db, window_key)
+            candidates = day.entries if self.exhaustive else day.candidates(lowered)
+            for entry in candidates:
+                for matcher in entry.matchers:
+                    matcher.set_seq1(lowered)
+                    if matcher.real_quick_ratio() < self.threshold:
+                        continue
+                    bound = matcher.quick_ratio()
+                    if bound >= self.threshold:
+                        bounded.append((bound, len(bounded), entry.event, matcher))
+        bounded.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+        best_order = len(bounded)
+        for bound, order, event, matcher in bounded:
+            if bound < best_score:
+                break
+            score = matcher.ratio()
+            if score < self.threshold:
+                continue
+            if score > best_score or (score == best_score and order < best_order):
+                best_event = event
+                best_score = score
+                best_order = order
+        return best_event, best_score
+
+
 def cluster_source_item(
-    db: Session, source_item: SourceItem, threshold: float = 0.6
+    db: Session,
+    source_item: SourceItem,
+    threshold: float | None = None,
+    index: EventIndex | None = None,
 ) -> EventMembership:
+    if index is None:
+        index = EventIndex(CLUSTER_THRESHOLD if threshold is None else threshold)
+    elif threshold is not None and threshold != index.threshold:
+        raise ValueError(f"threshold {threshold} does not match index threshold {index.threshold}")
+
     existing = db.execute(
         select(EventMembership).where(EventMembership.source_item_id == source_item.id)
     ).scalar_one_or_none()
@@ -48,21 +380,19 @@ def cluster_source_item(
         return existing
 
     date_key = source_item.discovered_at.strftime("%Y-%m-%d")
-    candidates = db.execute(select(Event).where(Event.date_key == date_key)).scalars().all()
     best_event = None
     best_score = 0.0
     if source_item.title:
-        for event in candidates:
-            score = similarity(source_item.title, event.title)
-            if score >= threshold and score > best_score:
-                best_event = event
-                best_score = score
+        best_event, best_score = index.best_match(db, date_key, source_item.title)
 
     if best_event is None:
         title = source_item.title or source_item.url
         best_event = Event(title=title, date_key=date_key)
         db.add(best_event)
         db.commit()
+        index.add(best_event)
+    elif source_item.title:
+        index.add_member(best_event, source_item.title, best_score)
 
     membership = EventMembership(
         event_id=best_event.id, source_item_id=source_item.id, confidence=best_score
@@ -72,10 +402,16 @@ def cluster_source_item(
     return membership
 
 
-def cluster_source_items(db: Session, items: Iterable[SourceItem]) -> int:
+def cluster_source_items(
+    db: Session,
+    items: Iterable[SourceItem],
+    threshold: float = CLUSTER_THRESHOLD,
+    exhaustive: bool = True,
+) -> int:
+    index = EventIndex(threshold, exhaustive=exhaustive)
     created = 0
     for item in items:
-        cluster_source_item(db, item)
+        cluster_source_item(db, item, index=index)
         created += 1
     return created
 
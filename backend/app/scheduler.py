@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable
+from urllib.parse import urlsplit
+
+import requests
+from redis import Redis
+
+from app.capture import (
+    CaptureThrottled,
+    capture_adaptive_job,
+    capture_source_item_job,
+    capture_text_only_job,
+)
+from app.settings import (
+    get_host_concurrency,
+    get_host_delay_ms,
+    get_host_lease_seconds,
+    get_redis_url,
+)
+
+_READY_KEY = "capture:hosts:ready"
+_LEASED_KEY = "capture:hosts:leased"
+_NEXT_AT_KEY = "capture:hosts:next_at"
+_PENDING_PREFIX = "capture:hosts:pending:"
+_LEASE_PREFIX = "capture:hosts:leases:"
+_METHODS_KEY = "capture:hosts:methods"
+THROTTLE_BACKOFF_SECONDS = 60.0
+
+_ACTIVATE_SCRIPT = """
+local now = tonumber(ARGV[1])
+for i = 2, #ARGV do
+  local host = ARGV[i]
+  local at = math.max(now, tonumber(redis.call('HGET', KEYS[2], host) or '0'))
+  redis.call('ZADD', KEYS[1], 'NX', at, host)
+end
+return #ARGV - 1
+"""
+
+_CLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local concurrency = tonumber(ARGV[3])
+local delay = tonumber(ARGV[4])
+local prefix = ARGV[5]
+local lease_prefix = ARGV[6]
+local lease = tonumber(ARGV[7])
+local hosts = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, limit)
+local claimed = {}
+for _, host in ipairs(hosts) do
+  redis.call('ZREMRANGEBYSCORE', lease_prefix .. host, '-inf', now)
+  if redis.call('ZCARD', lease_prefix .. host) >= concurrency then
+    redis.call('ZADD', KEYS[1], now + delay, host)
+  else
+    local item = redis.call('LPOP', prefix .. host)
+    if item then
+      redis.call('ZADD', lease_prefix .. host, now + lease, item)
+      redis.call('SADD', KEYS[2], host)
+      redis.call('HSET', KEYS[3], host, now + delay)
+      table.insert(claimed, host)
+      table.insert(claimed, item)
+      table.insert(claimed, redis.call('HGET', KEYS[4], item) or '')
+    end
+    if redis.call('LLEN', prefix .. host) > 0 then
+      redis.call('ZADD', KEYS[1], now + delay, host)
+    else
+      redis.call('ZREM', KEYS[1], host)
+    end
+  end
+end
+return claimed
+"""
+
+_RELEASE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local host = ARGV[2]
+local retry_after = ARGV[3]
+local requeue = ARGV[4]
+local prefix = ARGV[5]
+local lease_prefix = ARGV[6]
+local token = ARGV[7]
+redis.call('ZREM', lease_prefix .. host, token)
+if requeue == '' then
+  redis.call('HDEL', KEYS[4], token)
+end
+if redis.call('ZCARD', lease_prefix .. host) == 0 then
+  redis.call('SREM', KEYS[2], host)
+end
+local next_at = tonumber(redis.call('HGET', KEYS[3], host) or '0')
+if retry_after ~= '' then
+  local retry_at = now + tonumber(retry_after)
+  if retry_at > next_at then
+    next_at = retry_at
+    redis.call('HSET', KEYS[3], host, next_at)
+  end
+end
+if requeue ~= '' then
+  redis.call('LPUSH', prefix .. host, requeue)
+end
+if redis.call('LLEN', prefix .. host) > 0 then
+  redis.call('ZADD', KEYS[1], math.max(now, next_at), host)
+end
+return 1
+"""
+
+_REAP_SCRIPT = """
+local now = tonumber(ARGV[1])
+local lease_prefix = ARGV[2]
+for _, host in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+  redis.call('ZREMRANGEBYSCORE', lease_prefix .. host, '-inf', now)
+  if redis.call('ZCARD', lease_prefix .. host) == 0 then
+    redis.call('SREM', KEYS[1], host)
+  end
+end
+return redis.call('SCARD', KEYS[1])
+"""
+
+
+def host_for(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host or "unknown"
+
+
+def parse_retry_after(value: str | None, now: datetime | None = None) -> float | None:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class HostScheduler:
+    def __init__(
+        self,
+        redis: Redis | None = None,
+        concurrency: int | None = None,
+        delay_ms: int | None = None,
+        lease_seconds: int | None = None,
+    ) -> None:
+        self.redis = redis or Redis.from_url(get_redis_url())
+        self.concurrency = concurrency or get_host_concurrency()
+        self.delay = (delay_ms if delay_ms is not None else get_host_delay_ms()) / 1000
+        self.lease_seconds = lease_seconds or get_host_lease_seconds()
+        self._activate = self.redis.register_script(_ACTIVATE_SCRIPT)
+        self._claim = self.redis.register_script(_CLAIM_SCRIPT)
+        self._release = self.redis.register_script(_RELEASE_SCRIPT)
+        self._reap = self.redis.register_script(_REAP_SCRIPT)
+
+    def schedule(self, items: Iterable[tuple[str, str]], method: str = "browser") -> int:
+        hosts: set[str] = set()
+        scheduled = 0
+        pipeline = self.redis.pipeline(transaction=False)
+        for source_item_id, url in items:
+            host = host_for(url)
+            pipeline.hset(_METHODS_KEY, source_item_id, method)
+            pipeline.rpush(f"{_PENDING_PREFIX}{host}", source_item_id)
+            hosts.add(host)
+            scheduled += 1
+        pipeline.execute()
+        if hosts:
+            self._activate(keys=[_READY_KEY, _NEXT_AT_KEY], args=[time.time(), *sorted(hosts)])
+        return scheduled
+
+    def claim(self, limit: int = 100) -> list[tuple[str, str, str]]:
+        flat = self._claim(
+            keys=[_READY_KEY, _LEASED_KEY, _NEXT_AT_KEY, _METHODS_KEY],
+            args=[
+                time.time(),
+                limit,
+                self.concurrency,
+                self.delay,
+                _PENDING_PREFIX,
+                _LEASE_PREFIX,
+                self.lease_seconds,
+            ],
+        )
+        values = [value.decode("utf-8") for value in flat]
+        return list(zip(values[::3], values[1::3], values[2::3]))
+
+    def scheduled(self, items: list[tuple[str, str]]) -> set[str]:
+        pipeline = self.redis.pipeline(transaction=False)
+        for source_item_id, url in items:
+            host = host_for(url)
+            pipeline.lpos(f"{_PENDING_PREFIX}{host}", source_item_id)
+            pipeline.zscore(f"{_LEASE_PREFIX}{host}", source_item_id)
+        replies = pipeline.execute()
+        now = time.time()
+        return {
+            source_item_id
+            for (source_item_id, _), position, deadline in zip(items, replies[::2], replies[1::2])
+            if position is not None or (deadline is not None and deadline > now)
+        }
+
+    def release(
+        self,
+        host: str,
+        source_item_id: str,
+        retry_after: float | None = None,
+        requeue: str | None = None,
+    ) -> None:
+        self._release(
+            keys=[_READY_KEY, _LEASED_KEY, _NEXT_AT_KEY, _METHODS_KEY],
+            args=[
+                time.time(),
+                host,
+                "" if retry_after is None else retry_after,
+                requeue or "",
+                _PENDING_PREFIX,
+                _LEASE_PREFIX,
+                source_item_id,
+            ],
+        )
+
+    def is_idle(self) -> bool:
+        if self.redis.zcard(_READY_KEY):
+            return False
+        return self._reap(keys=[_LEASED_KEY], args=[time.time(), _LEASE_PREFIX]) == 0
+
+
+SCHEDULED_CAPTURE_JOBS = {
+    "browser": capture_source_item_job,
+    "text": capture_text_only_job,
+    "adaptive": capture_adaptive_job,
+}
+_scheduler: HostScheduler | None = None
+
+
+def get_scheduler() -> HostScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = HostScheduler()
+    return _scheduler
+
+
+def capture_scheduled_job(source_item_id: str, host: str, method: str = "browser") -> int:
+    retry_after = None
+    requeue = None
+    try:
+        return SCHEDULED_CAPTURE_JOBS[method](source_item_id)
+    except CaptureThrottled as exc:
+        retry_after = parse_retry_after(exc.retry_after)
+        if retry_after is None:
+            retry_after = THROTTLE_BACKOFF_SECONDS
+        requeue = source_item_id
+        return 0
+    except requests.HTTPError as exc:
+        headers = exc.response.headers if exc.response is not None else {}
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is None:
+            raise
+        requeue = source_item_id
+        return 0
+    finally:
+        get_scheduler().release(host, source_item_id, retry_after, requeue)
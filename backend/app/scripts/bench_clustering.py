@@ -0,0 +1,71 @@
+import argparse
+import random
+import time
+import uuid
+
+from app.models import Event
+from app.processing import EventIndex
+
+BENCH_DATE_KEY = "2026-01-07"
+_SYLLABLES = tuple(
+    consonant + vowel for consonant in "bdfgklmnprstvz" for vowel in ("a", "e", "i", "o", "u")
+)
+_FILLERS = ("the", "in", "of", "to", "on", "after", "amid", "says", "for")
+_DECORATIONS = ("", "", "", "Live: ", "Breaking: ", "Update: ")
+
+
+def _titles(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choices(_SYLLABLES, k=rng.randint(2, 4))) for _ in range(count * 2)
+    ]
+    stories = []
+    for _ in range(max(1, count // 3)):
+        words = rng.sample(vocabulary, rng.randint(4, 7))
+        words.insert(rng.randrange(len(words)), rng.choice(_FILLERS))
+        stories.append(words)
+    titles = []
+    for _ in range(count):
+        words = list(rng.choice(stories))
+        if rng.random() < 0.5:
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+        titles.append(rng.choice(_DECORATIONS) + " ".join(words).capitalize())
+    return titles
+
+
+def _cluster(
+    titles: list[str], exhaustive: bool, member_signatures: int
+) -> tuple[float, list[str]]:
+    index = EventIndex(exhaustive=exhaustive, window_days=0, member_signatures=member_signatures)
+    index.preload(BENCH_DATE_KEY, [])
+    assignments = []
+    start = time.perf_counter()
+    for title in titles:
+        event, score = index.best_match(None, BENCH_DATE_KEY, title)
+        if event is None:
+            event = Event(id=uuid.uuid4(), title=title, date_key=BENCH_DATE_KEY)
+            index.add(event)
+        else:
+            index.add_member(event, title, score)
+        assignments.append(event.title)
+    return time.perf_counter() - start, assignments
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark indexed event clustering.")
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--member-signatures", type=int, default=0)
+    args = parser.parse_args()
+
+    titles = _titles(args.items, args.seed)
+    scan_seconds, expected = _cluster(titles, True, args.member_signatures)
+    indexed_seconds, assigned = _cluster(titles, False, args.member_signatures)
+    agreed = sum(a == b for a, b in zip(expected, assigned))
+    print(f"exhaustive: {scan_seconds:.2f}s events={len(set(expected))}")
+    print(f"indexed: {indexed_seconds:.2f}s events={len(set(assigned))}")
+    print(f"agreement: {agreed}/{len(titles)} speedup={scan_seconds / indexed_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
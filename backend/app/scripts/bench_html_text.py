@@ -0,0 +1,62 @@
+import argparse
+import html as html_lib
+import os
+import re
+import time
+
+from app.html_text import extract_main_text_from_blob
+from app.settings import get_artifact_root
+from app.storage import read_blob
+from app.text_utils import hash_text, normalize_text
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _regex_text(path: str) -> str:
+    decoded = read_blob(path).decode("utf-8", errors="ignore")
+    return html_lib.unescape(_TAG_RE.sub(" ", decoded))
+
+
+def _html_paths(roots: list[str], limit: int) -> list[str]:
+    paths = []
+    for root in roots:
+        if os.path.isfile(root):
+            paths.append(root)
+            continue
+        for directory, _, names in os.walk(root):
+            paths.extend(
+                os.path.join(directory, name)
+                for name in names
+                if name.endswith(".html") or name.endswith(".html.zst")
+            )
+    return sorted(paths)[:limit]
+
+
+def _run(label: str, extract, paths: list[str]) -> set[str]:
+    start = time.perf_counter()
+    texts = [normalize_text(extract(path)) for path in paths]
+    elapsed = time.perf_counter() - start
+    size = sum(len(text) for text in texts)
+    print(f"{label}: {elapsed:.2f}s ({len(paths) / elapsed:.0f} pages/s) chars={size}")
+    return {hash_text(text) for text in texts}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare the main-content extractor with regex tag stripping on HTML blobs."
+    )
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--limit", type=int, default=2000)
+    args = parser.parse_args()
+
+    paths = _html_paths(args.paths or [os.path.join(get_artifact_root(), "blobs")], args.limit)
+    if not paths:
+        raise SystemExit("no HTML artifacts found")
+    print(f"pages: {len(paths)} bytes={sum(os.path.getsize(path) for path in paths)}")
+    regex_hashes = _run("regex", _regex_text, paths)
+    extractor_hashes = _run("extractor", extract_main_text_from_blob, paths)
+    print(f"distinct texts: regex={len(regex_hashes)} extractor={len(extractor_hashes)}")
+
+
+if __name__ == "__main__":
+    main()
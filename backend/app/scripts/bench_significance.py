@@ -0,0 +1,79 @@
+import argparse
+import random
+import re
+import time
+
+from app.significance import (
+    _EXCLUDE_PHRASES,
+    _EXCLUDE_TOKENS,
+    _WHITELIST_PHRASES,
+    _WHITELIST_TOKENS,
+    classify_many,
+    is_significant,
+)
+
+_FILLER = (
+    "officials said on tuesday that the plan would move forward after weeks of talks "
+    "between regional leaders and analysts who expect further changes next year"
+).split()
+_CATEGORIES = ["Politics", "Sports", "World", "Business", "Lifestyle", "Health", "Local", ""]
+
+
+def _reference(categories: list[str], title: str, summary: str) -> bool:
+    def decide(text: str) -> bool:
+        lowered = text.lower()
+        if any(phrase in lowered for phrase in _EXCLUDE_PHRASES):
+            return False
+        tokens = set(re.findall(r"[a-z0-9]+", lowered))
+        if tokens & _EXCLUDE_TOKENS:
+            return False
+        if any(phrase in lowered for phrase in _WHITELIST_PHRASES):
+            return True
+        return bool(tokens & _WHITELIST_TOKENS)
+
+    category_text = " ".join(categories).strip()
+    if category_text:
+        return decide(category_text)
+    fallback_text = " ".join([title, summary]).strip()
+    return decide(fallback_text) if fallback_text else False
+
+
+def _corpus(size: int, seed: int) -> list[tuple[list[str], str, str]]:
+    rng = random.Random(seed)
+    terms = sorted(_WHITELIST_PHRASES | _WHITELIST_TOKENS | _EXCLUDE_PHRASES | _EXCLUDE_TOKENS)
+    entries = []
+    for _ in range(size):
+        category = rng.choice(_CATEGORIES)
+        title = " ".join(rng.choices(_FILLER, k=8) + [rng.choice(terms)])
+        summary = " ".join(rng.choices(_FILLER, k=rng.randint(20, 60)) + [rng.choice(terms)])
+        entries.append(([category] if category else [], title.capitalize(), summary))
+    return entries
+
+
+def _timed(label: str, func) -> tuple[float, list[bool]]:
+    start = time.perf_counter()
+    decisions = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed:.3f}s")
+    return elapsed, decisions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the significance matcher.")
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    entries = _corpus(args.entries, args.seed)
+    base, expected = _timed("reference", lambda: [_reference(*entry) for entry in entries])
+    single, decisions = _timed("is_significant", lambda: [is_significant(*e) for e in entries])
+    batch, batched = _timed(
+        "classify_many", lambda: [match.significant for match in classify_many(entries)]
+    )
+    if decisions != expected or batched != expected:
+        raise SystemExit("decisions differ from the reference implementation")
+    print(f"speedup: is_significant={base / single:.2f}x classify_many={base / batch:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
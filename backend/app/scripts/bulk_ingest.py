@@ -0,0 +1,37 @@
+import argparse
+
+from app.db import SessionLocal, init_engine
+from app.ingest import STREAM_CHUNK_LINES, ingest_urls_streaming
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Stream a very large URL list into SourceItems with resumable checkpoints."
+    )
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_LINES)
+    parser.add_argument("--checkpoint", default=None)
+    args = parser.parse_args()
+
+    engine = init_engine()
+    db = SessionLocal()
+    try:
+        result = ingest_urls_streaming(
+            db,
+            args.path,
+            chunk_size=args.chunk_size,
+            checkpoint_path=args.checkpoint,
+            on_progress=lambda checkpoint: print(
+                f"offset={checkpoint.offset} created={checkpoint.created} "
+                f"skipped={checkpoint.skipped}",
+                flush=True,
+            ),
+        )
+        print(f"URL: created={result.created} skipped={result.skipped}")
+    finally:
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+
+from sqlalchemy import select, tuple_
+
+from app.canonical import canonicalize_url
+from app.capture import backfill_canonical_url
+from app.db import SessionLocal, init_engine
+from app.models import SourceItem
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Recompute URL-derived canonical_url values with the current rules. "
+            "Values taken from rel=canonical at capture are kept."
+        )
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    engine = init_engine()
+    db = SessionLocal()
+    try:
+        updated = 0
+        conflicts = 0
+        cursor = None
+        while True:
+            query = (
+                select(
+                    SourceItem.id,
+                    SourceItem.url,
+                    SourceItem.canonical_url,
+                    SourceItem.discovered_at,
+                )
+                .where(SourceItem.canonical_from_capture.is_(False))
+                .order_by(SourceItem.discovered_at, SourceItem.id)
+            )
+            if cursor is not None:
+                query = query.where(
+                    tuple_(SourceItem.discovered_at, SourceItem.id) > tuple_(*cursor)
+                )
+            rows = db.execute(query.limit(args.batch_size)).all()
+            if not rows:
+                break
+            for row in rows:
+                if canonicalize_url(row.url) == row.canonical_url:
+                    continue
+                if backfill_canonical_url(db, row.id, row.url, from_capture=False):
+                    updated += 1
+                else:
+                    conflicts += 1
+            db.commit()
+            cursor = (rows[-1].discovered_at, rows[-1].id)
+        print(f"Updated {updated} canonical URLs ({conflicts} already claimed by another item)")
+    finally:
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
 import argparse
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import select, tuple_, update
+
 from app.db import SessionLocal, init_engine
 from app.models import SourceItem
-from app.significance import is_significant
+from app.significance import classify_many
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Mark recent non-significant items as filtered.")
     parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--batch-size", type=int, default=5000)
     parser.add_argument("--dry-run", action="store_true")
     args = parser.parse_args()
 
@@ -17,32 +20,62 @@ def main() -> None:
     engine = init_engine()
     db = SessionLocal()
     try:
-        candidates = (
-            db.query(SourceItem)
-            .filter(SourceItem.discovered_at >= cutoff)
-            .filter(SourceItem.is_filtered.is_(False))
-            .all()
-        )
-        if not candidates:
-            print("No recent SourceItems to evaluate.")
-            return
-
+        evaluated = 0
         updated = 0
-        for item in candidates:
-            if item.is_significant is None:
-                item.is_significant = is_significant([], item.title or "", "")
-            if item.is_significant is False:
-                item.is_filtered = True
-                item.capture_status = "filtered"
-                updated += 1
-
-        if args.dry_run:
-            print(f"Dry run: would filter {updated} SourceItems.")
-            db.rollback()
-            return
+        cursor = None
+        while True:
+            query = (
+                select(
+                    SourceItem.id,
+                    SourceItem.title,
+                    SourceItem.is_significant,
+                    SourceItem.discovered_at,
+                )
+                .where(SourceItem.discovered_at >= cutoff)
+                .where(SourceItem.is_filtered.is_(False))
+                .order_by(SourceItem.discovered_at, SourceItem.id)
+            )
+            if cursor is not None:
+                query = query.where(
+                    tuple_(SourceItem.discovered_at, SourceItem.id) > tuple_(*cursor)
+                )
+            rows = db.execute(query.limit(args.batch_size)).all()
+            if not rows:
+                break
+            cursor = (rows[-1].discovered_at, rows[-1].id)
+            evaluated += len(rows)
 
-        db.commit()
-        print(f"Filtered {updated} SourceItems.")
+            unscored = [row for row in rows if row.is_significant is None]
+            matches = classify_many(([], row.title or "", "") for row in unscored)
+            significant_ids = [row.id for row, match in zip(unscored, matches) if match.significant]
+            filtered_ids = [row.id for row in rows if row.is_significant is False]
+            filtered_ids.extend(
+                row.id for row, match in zip(unscored, matches) if not match.significant
+            )
+            updated += len(filtered_ids)
+
+            if not args.dry_run:
+                if significant_ids:
+                    db.execute(
+                        update(SourceItem)
+                        .where(SourceItem.id.in_(significant_ids))
+                        .values(is_significant=True)
+                    )
+                if filtered_ids:
+                    db.execute(
+                        update(SourceItem)
+                        .where(SourceItem.id.in_(filtered_ids))
+                        .values(is_significant=False, is_filtered=True, capture_status="filtered")
+                    )
+                db.commit()
+            print(f"Evaluated {evaluated} SourceItems, {updated} to filter", flush=True)
+
+        if not evaluated:
+            print("No recent SourceItems to evaluate.")
+        elif args.dry_run:
+            print(f"Dry run: would filter {updated} SourceItems.")
+        else:
+            print(f"Filtered {updated} SourceItems.")
     finally:
         db.close()
         engine.dispose()
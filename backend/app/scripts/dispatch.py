@@ -0,0 +1,40 @@
+import argparse
+import time
+
+from app.queue import get_queue
+from app.scheduler import HostScheduler, capture_scheduled_job
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Move host-scheduled SourceItems onto the capture queue politely."
+    )
+    parser.add_argument(
+        "--text-only",
+        action="store_true",
+        help="Capture method for items scheduled without one.",
+    )
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--poll-seconds", type=float, default=0.5)
+    parser.add_argument("--burst", action="store_true")
+    args = parser.parse_args()
+
+    scheduler = HostScheduler()
+    queue = get_queue()
+    dispatched = 0
+    while True:
+        claimed = scheduler.claim(args.batch)
+        for host, source_item_id, method in claimed:
+            method = method or ("text" if args.text_only else "browser")
+            queue.enqueue(capture_scheduled_job, source_item_id, host, method)
+        dispatched += len(claimed)
+        if claimed:
+            continue
+        if args.burst and scheduler.is_idle():
+            break
+        time.sleep(args.poll_seconds)
+    print(f"Dispatched {dispatched} capture jobs")
+
+
+if __name__ == "__main__":
+    main()
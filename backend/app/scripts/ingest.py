@@ -1,15 +1,12 @@
 import argparse
 
-from app.capture import (
-    capture_source_item,
-    capture_source_item_job,
-    capture_text_only,
-    capture_text_only_job,
-)
+from app.async_capture import capture_source_items
+from app.browser_pool import BrowserPool
+from app.capture import capture_adaptive, capture_text_only
+from app.capture_queue import CaptureHandoff, enqueue_pending
 from app.db import SessionLocal, init_engine
 from app.ingest import ingest_rss_from_file, ingest_urls_from_file
 from app.models import SourceItem
-from app.queue import get_queue
 from app.settings import get_rss_path, get_urls_path
 
 
@@ -17,33 +14,34 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Ingest sources into SourceItems.")
     parser.add_argument("--rss-path", default=get_rss_path())
     parser.add_argument("--urls-path", default=get_urls_path())
+    parser.add_argument("--all-feeds", action="store_true")
     parser.add_argument("--enqueue", action="store_true")
+    parser.add_argument("--polite", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=1)
     parser.add_argument("--capture-now", action="store_true")
     parser.add_argument("--text-only", action="store_true")
+    parser.add_argument("--adaptive", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=None)
     args = parser.parse_args()
+    if args.polite and args.batch_size > 1:
+        parser.error("--polite dispatches one item per job; drop --batch-size")
 
     engine = init_engine()
     db = SessionLocal()
     try:
-        rss_result = ingest_rss_from_file(db, args.rss_path)
+        rss_result = ingest_rss_from_file(db, args.rss_path, force=args.all_feeds)
         url_result = ingest_urls_from_file(db, args.urls_path)
         print(f"RSS: created={rss_result.created} skipped={rss_result.skipped}")
         print(f"URL: created={url_result.created} skipped={url_result.skipped}")
 
         if args.enqueue:
-            queue = get_queue()
-            pending = (
-                db.query(SourceItem)
-                .filter(SourceItem.capture_status == "pending")
-                .filter(SourceItem.is_filtered.is_(False))
-                .all()
-            )
-            for item in pending:
-                if args.text_only:
-                    queue.enqueue(capture_text_only_job, str(item.id))
-                else:
-                    queue.enqueue(capture_source_item_job, str(item.id))
-            print(f"Enqueued {len(pending)} capture jobs")
+            method = "adaptive" if args.adaptive else "text" if args.text_only else "browser"
+            handoff = CaptureHandoff(method, polite=args.polite, batch_size=args.batch_size)
+            handed = enqueue_pending(db, handoff)
+            if args.polite:
+                print(f"Scheduled {handed} items for polite dispatch")
+            else:
+                print(f"Enqueued capture jobs for {handed} items")
         elif args.capture_now:
             pending = (
                 db.query(SourceItem)
@@ -51,12 +49,20 @@ def main() -> None:
                 .filter(SourceItem.is_filtered.is_(False))
                 .all()
             )
-            for item in pending:
-                if args.text_only:
+            if args.adaptive:
+                with BrowserPool() as pool:
+                    for item in pending:
+                        capture_adaptive(db, str(item.id), pool)
+                print(f"Captured {len(pending)} items")
+            elif args.text_only:
+                for item in pending:
                     capture_text_only(db, str(item.id))
-                else:
-                    capture_source_item(db, str(item.id))
-            print(f"Captured {len(pending)} items")
+                print(f"Captured {len(pending)} items")
+            else:
+                result = capture_source_items(
+                    db, [str(item.id) for item in pending], concurrency=args.concurrency
+                )
+                print(f"Captured {result.captured} items (failed={result.failed})")
     finally:
         db.close()
         engine.dispose()
@@ -0,0 +1,33 @@
+import argparse
+
+from app.capture_queue import CaptureHandoff
+from app.ingest_daemon import IngestDaemon
+from app.settings import get_rss_path, get_urls_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run a resident ingest service that hands new items straight to capture."
+    )
+    parser.add_argument("--rss-path", default=get_rss_path())
+    parser.add_argument("--urls-path", default=get_urls_path())
+    parser.add_argument("--sweep-seconds", type=float, default=None)
+    parser.add_argument("--watch-seconds", type=float, default=None)
+    parser.add_argument("--text-only", action="store_true")
+    parser.add_argument("--adaptive", action="store_true")
+    parser.add_argument("--polite", action="store_true")
+    args = parser.parse_args()
+
+    method = "adaptive" if args.adaptive else "text" if args.text_only else "browser"
+    daemon = IngestDaemon(
+        args.rss_path,
+        args.urls_path,
+        CaptureHandoff(method, polite=args.polite),
+        sweep_seconds=args.sweep_seconds,
+        watch_seconds=args.watch_seconds,
+    )
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()
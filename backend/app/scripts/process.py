@@ -1,59 +1,85 @@
 import argparse
-import html as html_lib
-import re
+from concurrent.futures import ProcessPoolExecutor
 
-from app.db import SessionLocal, init_engine
-from app.models import Artifact, SourceItem
-from app.processing import list_unclustered_items, upsert_normalized_text, cluster_source_items
+from sqlalchemy import select
 
-_TAG_RE = re.compile(r"<[^>]+>")
+from app.db import SessionLocal, init_engine
+from app.html_text import extract_main_text_from_blob
+from app.models import Artifact, NormalizedText, SourceItem
+from app.processing import (
+    PreparedText,
+    cluster_source_items,
+    insert_normalized_texts,
+    list_unclustered_items,
+    prepare_text,
+)
+from app.settings import get_normalize_workers
+from app.storage import read_blob
 
 
-def _load_text_artifact(db, source_item_id):
-    return (
-        db.query(Artifact)
-        .filter(Artifact.source_item_id == source_item_id, Artifact.type.in_(["text", "html"]))
-        .one_or_none()
+def _pending_text_artifacts(db, after, limit: int) -> list[tuple]:
+    query = (
+        select(Artifact.source_item_id, Artifact.type, Artifact.storage_uri)
+        .join(SourceItem, SourceItem.id == Artifact.source_item_id)
+        .outerjoin(NormalizedText, NormalizedText.source_item_id == Artifact.source_item_id)
+        .where(SourceItem.capture_status == "captured")
+        .where(SourceItem.is_filtered.is_(False))
+        .where(Artifact.type.in_(["text", "html"]))
+        .where(NormalizedText.id.is_(None))
+        .order_by(
+            Artifact.source_item_id, (Artifact.type == "text").desc(), Artifact.created_at.desc()
+        )
+        .distinct(Artifact.source_item_id)
+        .limit(limit)
     )
+    if after is not None:
+        query = query.where(Artifact.source_item_id > after)
+    return [tuple(row) for row in db.execute(query).all()]
+
 
+def _extract_text(artifact_type: str, storage_uri: str) -> str:
+    if artifact_type == "html":
+        return extract_main_text_from_blob(storage_uri)
+    return read_blob(storage_uri).decode("utf-8", errors="ignore")
 
-def _extract_text(artifact: Artifact) -> str:
-    if artifact.type == "html":
-        with open(artifact.storage_uri, "rb") as handle:
-            raw = handle.read()
-        decoded = raw.decode("utf-8", errors="ignore")
-        stripped = _TAG_RE.sub(" ", decoded)
-        return html_lib.unescape(stripped)
-    with open(artifact.storage_uri, "r", encoding="utf-8", errors="ignore") as handle:
-        return handle.read()
+
+def _prepare(row: tuple) -> PreparedText | None:
+    source_item_id, artifact_type, storage_uri = row
+    try:
+        return prepare_text(source_item_id, _extract_text(artifact_type, storage_uri))
+    except OSError:
+        return None
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Process SourceItems for Phase 3.")
     parser.add_argument("--normalize", action="store_true")
     parser.add_argument("--cluster", action="store_true")
+    parser.add_argument("--prefix-filter", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
     args = parser.parse_args()
 
     engine = init_engine()
     db = SessionLocal()
     try:
         if args.normalize:
-            items = (
-                db.query(SourceItem)
-                .filter(SourceItem.capture_status == "captured")
-                .filter(SourceItem.is_filtered.is_(False))
-                .all()
-            )
-            for item in items:
-                artifact = _load_text_artifact(db, item.id)
-                if not artifact:
-                    continue
-                raw_text = _extract_text(artifact)
-                upsert_normalized_text(db, item, raw_text)
+            normalized = 0
+            after = None
+            with ProcessPoolExecutor(max_workers=args.workers or get_normalize_workers()) as pool:
+                while True:
+                    rows = _pending_text_artifacts(db, after, args.batch_size)
+                    if not rows:
+                        break
+                    after = rows[-1][0]
+                    prepared = [item for item in pool.map(_prepare, rows, chunksize=16) if item]
+                    normalized += insert_normalized_texts(db, prepared)
+                    db.commit()
+                    print(f"Normalized {normalized} SourceItems", flush=True)
 
         if args.cluster:
             items = list_unclustered_items(db)
-            cluster_source_items(db, items)
+            cluster_source_items(db, items, exhaustive=not args.prefix_filter)
     finally:
         db.close()
         engine.dispose()
@@ -0,0 +1,56 @@
+import argparse
+import os
+from itertools import islice
+
+from sqlalchemy import select
+
+from app.db import SessionLocal, init_engine
+from app.models import Artifact
+from app.settings import get_artifact_sweep_grace_seconds
+from app.storage import iter_stale_blobs
+
+
+def _unreferenced(db, paths: list[str]) -> list[str]:
+    referenced = set(
+        db.execute(select(Artifact.storage_uri).where(Artifact.storage_uri.in_(paths))).scalars()
+    )
+    return [path for path in paths if path not in referenced]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Delete content-addressed blobs that no Artifact references."
+    )
+    parser.add_argument("--grace-seconds", type=int, default=get_artifact_sweep_grace_seconds())
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    engine = init_engine()
+    db = SessionLocal()
+    try:
+        checked = 0
+        removed = 0
+        stale = iter_stale_blobs(args.grace_seconds)
+        while batch := list(islice(stale, args.batch_size)):
+            checked += len(batch)
+            for path in _unreferenced(db, batch):
+                removed += 1
+                if not args.dry_run:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            print(f"Checked {checked} blobs, {removed} unreferenced", flush=True)
+
+        if args.dry_run:
+            print(f"Dry run: would remove {removed} of {checked} stale blobs.")
+        else:
+            print(f"Removed {removed} of {checked} stale blobs.")
+    finally:
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+
+import zstandard
+from sqlalchemy import select
+
+from app.db import SessionLocal, init_engine
+from app.models import Artifact, SourceItem
+from app.storage import read_blob, save_dictionary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Train per-publisher zstd dictionaries for text and HTML artifacts."
+    )
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--min-samples", type=int, default=20)
+    parser.add_argument("--dict-bytes", type=int, default=112640)
+    args = parser.parse_args()
+
+    engine = init_engine()
+    db = SessionLocal()
+    try:
+        publishers = (
+            db.execute(select(SourceItem.publisher).where(SourceItem.publisher.isnot(None)).distinct())
+            .scalars()
+            .all()
+        )
+        for publisher in publishers:
+            uris = (
+                db.execute(
+                    select(Artifact.storage_uri)
+                    .join(SourceItem, SourceItem.id == Artifact.source_item_id)
+                    .where(SourceItem.publisher == publisher)
+                    .where(Artifact.type.in_(["text", "html"]))
+                    .order_by(Artifact.created_at.desc())
+                    .limit(args.samples)
+                )
+                .scalars()
+                .all()
+            )
+            if len(uris) < args.min_samples:
+                continue
+            samples = [read_blob(uri) for uri in uris]
+            trained = zstandard.train_dictionary(args.dict_bytes, samples)
+            dict_id = save_dictionary(publisher, trained.as_bytes())
+            print(f"{publisher}: dict_id={dict_id} samples={len(samples)}")
+    finally:
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
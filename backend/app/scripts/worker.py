@@ -0,0 +1,24 @@
+import argparse
+
+from rq import SimpleWorker
+
+from app.db import get_worker_engine
+from app.queue import get_queue
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run an in-process RQ worker that keeps capture resources warm between jobs."
+    )
+    parser.add_argument("queues", nargs="*", default=["default"])
+    parser.add_argument("--burst", action="store_true")
+    args = parser.parse_args()
+
+    get_worker_engine()
+    queues = [get_queue(name) for name in args.queues]
+    worker = SimpleWorker(queues, connection=queues[0].connection)
+    worker.work(burst=args.burst)
+
+
+if __name__ == "__main__":
+    main()
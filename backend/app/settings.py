@@ -35,3 +35,108 @@ def get_urls_path() -> str:
 def get_cors_origins() -> list[str]:
     raw = os.environ.get("CORS_ORIGINS", "http://localhost:3000")
     return [origin.strip() for origin in raw.split(",") if origin.strip()]
+
+
+def get_browser_pool_size() -> int:
+    return int(os.environ.get("BROWSER_POOL_SIZE", "2"))
+
+
+def get_browser_max_pages() -> int:
+    return int(os.environ.get("BROWSER_MAX_PAGES", "200"))
+
+
+def get_capture_concurrency() -> int:
+    return int(os.environ.get("CAPTURE_CONCURRENCY", "8"))
+
+
+def get_artifact_sweep_grace_seconds() -> int:
+    return int(os.environ.get("ARTIFACT_SWEEP_GRACE_SECONDS", "86400"))
+
+
+def get_artifact_compression() -> str:
+    return os.environ.get("ARTIFACT_COMPRESSION", "none").strip().lower()
+
+
+def get_artifact_compression_level() -> int:
+    return int(os.environ.get("ARTIFACT_COMPRESSION_LEVEL", "10"))
+
+
+def get_host_concurrency() -> int:
+    return int(os.environ.get("CAPTURE_HOST_CONCURRENCY", "2"))
+
+
+def get_host_delay_ms() -> int:
+    return int(os.environ.get("CAPTURE_HOST_DELAY_MS", "2000"))
+
+
+def get_host_lease_seconds() -> int:
+    return int(os.environ.get("CAPTURE_HOST_LEASE_SECONDS", "900"))
+
+
+def get_shell_min_text_chars() -> int:
+    return int(os.environ.get("SHELL_MIN_TEXT_CHARS", "400"))
+
+
+def get_capture_profile() -> str:
+    return os.environ.get("CAPTURE_PROFILE", "ads").strip().lower()
+
+
+def get_capture_block_domains() -> list[str]:
+    raw = os.environ.get("CAPTURE_BLOCK_DOMAINS", "")
+    return [domain.strip().lower() for domain in raw.split(",") if domain.strip()]
+
+
+def get_capture_queued_grace_seconds() -> int:
+    return int(os.environ.get("CAPTURE_QUEUED_GRACE_SECONDS", "300"))
+
+
+def get_capture_settle_ms() -> int:
+    return int(os.environ.get("CAPTURE_SETTLE_MS", "3000"))
+
+
+def get_http_pool_size() -> int:
+    return int(os.environ.get("HTTP_POOL_SIZE", "32"))
+
+
+def get_feed_workers() -> int:
+    return int(os.environ.get("INGEST_FEED_WORKERS", "16"))
+
+
+def get_feed_timeout() -> float:
+    return float(os.environ.get("INGEST_FEED_TIMEOUT", "20"))
+
+
+def get_feed_min_interval() -> int:
+    return int(os.environ.get("INGEST_FEED_MIN_INTERVAL", "120"))
+
+
+def get_feed_max_interval() -> int:
+    return int(os.environ.get("INGEST_FEED_MAX_INTERVAL", "21600"))
+
+
+def get_ingest_sweep_seconds() -> float:
+    return float(os.environ.get("INGEST_SWEEP_SECONDS", "30"))
+
+
+def get_ingest_watch_seconds() -> float:
+    return float(os.environ.get("INGEST_WATCH_SECONDS", "2"))
+
+
+def get_normalize_workers() -> int:
+    return int(os.environ.get("PROCESS_NORMALIZE_WORKERS", str(os.cpu_count() or 2)))
+
+
+def get_cluster_window_days() -> int:
+    return int(os.environ.get("CLUSTER_WINDOW_DAYS", "0"))
+
+
+def get_cluster_member_signatures() -> int:
+    return int(os.environ.get("CLUSTER_MEMBER_SIGNATURES", "0"))
+
+
+def get_near_duplicate_threshold() -> float:
+    return float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+
+def get_canonical_rules_path() -> str:
+    return os.environ.get("CANONICAL_RULES_PATH", "./data/canonical_rules.json")
@@ -1,4 +1,7 @@
-import re
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
 
 _WHITELIST_PHRASES = {
     "public health",
@@ -82,36 +85,90 @@ _EXCLUDE_TOKENS = {
     "culture",
 }
 
+_TOKEN_BYTES = frozenset(b"abcdefghijklmnopqrstuvwxyz0123456789")
+_TOKEN_TABLE = bytes(byte if byte in _TOKEN_BYTES else 0x20 for byte in range(256))
 
-def _tokenize(text: str) -> set[str]:
-    return set(re.findall(r"[a-z0-9]+", text.lower()))
 
+def _decisive_text(categories: list[str], title: str, summary: str) -> str:
+    return " ".join(categories).strip() or " ".join([title, summary]).strip()
 
-def _matches_phrases(text: str, phrases: set[str]) -> bool:
-    lowered = text.lower()
-    return any(phrase in lowered for phrase in phrases)
 
+@dataclass(frozen=True)
+class SignificanceMatch:
+    significant: bool
+    excluded: tuple[str, ...] = ()
+    included: tuple[str, ...] = ()
 
-def is_significant(categories: list[str], title: str, summary: str) -> bool:
-    category_text = " ".join(categories).strip()
-    if category_text:
-        if _matches_phrases(category_text, _EXCLUDE_PHRASES):
+
+class SignificanceMatcher:
+    def __init__(
+        self,
+        whitelist_phrases: Iterable[str],
+        whitelist_tokens: Iterable[str],
+        exclude_phrases: Iterable[str],
+        exclude_tokens: Iterable[str],
+    ) -> None:
+        self._exclude_phrases = tuple(sorted(exclude_phrases))
+        self._whitelist_phrases = tuple(sorted(whitelist_phrases))
+        self._exclude_tokens = frozenset(token.encode("ascii") for token in exclude_tokens)
+        self._whitelist_tokens = frozenset(token.encode("ascii") for token in whitelist_tokens)
+
+    def _tokens(self, lowered: str) -> set[bytes]:
+        return set(lowered.encode("ascii", "replace").translate(_TOKEN_TABLE).split())
+
+    def is_match(self, text: str) -> bool:
+        if not text:
             return False
-        category_tokens = _tokenize(category_text)
-        if category_tokens & _EXCLUDE_TOKENS:
+        lowered = text.lower()
+        if any(phrase in lowered for phrase in self._exclude_phrases):
             return False
-        if _matches_phrases(category_text, _WHITELIST_PHRASES):
+        tokens = self._tokens(lowered)
+        if not tokens.isdisjoint(self._exclude_tokens):
+            return False
+        if any(phrase in lowered for phrase in self._whitelist_phrases):
             return True
-        return bool(category_tokens & _WHITELIST_TOKENS)
-
-    fallback_text = " ".join([title, summary]).strip()
-    if not fallback_text:
-        return False
-    if _matches_phrases(fallback_text, _EXCLUDE_PHRASES):
-        return False
-    fallback_tokens = _tokenize(fallback_text)
-    if fallback_tokens & _EXCLUDE_TOKENS:
-        return False
-    if _matches_phrases(fallback_text, _WHITELIST_PHRASES):
-        return True
-    return bool(fallback_tokens & _WHITELIST_TOKENS)
+        return not tokens.isdisjoint(self._whitelist_tokens)
+
+    def match_text(self, text: str) -> SignificanceMatch:
+        if not text:
+            return SignificanceMatch(False)
+        lowered = text.lower()
+        tokens = self._tokens(lowered)
+        excluded = [phrase for phrase in self._exclude_phrases if phrase in lowered]
+        excluded.extend(token.decode() for token in sorted(tokens & self._exclude_tokens))
+        included = [phrase for phrase in self._whitelist_phrases if phrase in lowered]
+        included.extend(token.decode() for token in sorted(tokens & self._whitelist_tokens))
+        return SignificanceMatch(not excluded and bool(included), tuple(excluded), tuple(included))
+
+    def classify(self, categories: list[str], title: str, summary: str) -> SignificanceMatch:
+        return self.match_text(_decisive_text(categories, title, summary))
+
+    def classify_many(
+        self, entries: Iterable[tuple[list[str], str, str]]
+    ) -> list[SignificanceMatch]:
+        seen: dict[str, SignificanceMatch] = {}
+        results: list[SignificanceMatch] = []
+        for categories, title, summary in entries:
+            text = _decisive_text(categories, title, summary)
+            match = seen.get(text)
+            if match is None:
+                match = seen[text] = self.match_text(text)
+            results.append(match)
+        return results
+
+
+_MATCHER = SignificanceMatcher(
+    _WHITELIST_PHRASES, _WHITELIST_TOKENS, _EXCLUDE_PHRASES, _EXCLUDE_TOKENS
+)
+
+
+def classify(categories: list[str], title: str, summary: str) -> SignificanceMatch:
+    return _MATCHER.classify(categories, title, summary)
+
+
+def classify_many(entries: Iterable[tuple[list[str], str, str]]) -> list[SignificanceMatch]:
+    return _MATCHER.classify_many(entries)
+
+
+def is_significant(categories: list[str], title: str, summary: str) -> bool:
+    return _MATCHER.is_match(_decisive_text(categories, title, summary))
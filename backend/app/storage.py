@@ -1,40 +1,186 @@
 import hashlib
+import json
+import mmap
 import os
-from datetime import datetime
+import tempfile
+import time
+from functools import lru_cache
+from typing import Iterable, Iterator
 
-from app.settings import get_artifact_root, get_max_capture_bytes
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
+from app.settings import (
+    get_artifact_compression,
+    get_artifact_compression_level,
+    get_artifact_root,
+    get_max_capture_bytes,
+)
 
-def build_artifact_path(
-    date_key: str, publisher: str | None, source_item_id: str, artifact_type: str, ext: str
-) -> str:
-    safe_publisher = (publisher or "unknown").replace("/", "_").strip() or "unknown"
-    filename = f"{artifact_type}.{ext}"
-    return os.path.join(get_artifact_root(), date_key, safe_publisher, source_item_id, filename)
+STREAM_CHUNK_BYTES = 64 * 1024
+COMPRESSIBLE_EXTS = {"html", "txt"}
+COMPRESSED_SUFFIX = ".zst"
+
+
+def build_blob_path(sha256: str, ext: str) -> str:
+    return os.path.join(get_artifact_root(), "blobs", sha256[:2], sha256[2:4], f"{sha256}.{ext}")
+
+
+def _dictionary_dir() -> str:
+    return os.path.join(get_artifact_root(), "dicts")
+
+
+def _safe_publisher(publisher: str | None) -> str:
+    return (publisher or "unknown").replace("/", "_").strip() or "unknown"
+
+
+@lru_cache(maxsize=256)
+def load_dictionary(dict_id: int):
+    path = os.path.join(_dictionary_dir(), f"{dict_id}.zdict")
+    with open(path, "rb") as handle:
+        return zstandard.ZstdCompressionDict(handle.read())
+
+
+def _publisher_dictionaries() -> dict[str, int]:
+    path = os.path.join(_dictionary_dir(), "publishers.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_dictionary(publisher: str | None, dict_data: bytes) -> int:
+    dict_id = zstandard.ZstdCompressionDict(dict_data).dict_id()
+    directory = _dictionary_dir()
+    write_stream(os.path.join(directory, f"{dict_id}.zdict"), [dict_data])
+    index = _publisher_dictionaries()
+    index[_safe_publisher(publisher)] = dict_id
+    payload = json.dumps(index, sort_keys=True, indent=2).encode("utf-8")
+    write_stream(os.path.join(directory, "publishers.json"), [payload])
+    return dict_id
+
+
+def _compressor_for(ext: str, publisher: str | None):
+    if ext not in COMPRESSIBLE_EXTS or get_artifact_compression() != "zstd":
+        return None
+    if zstandard is None:
+        raise RuntimeError("ARTIFACT_COMPRESSION=zstd requires the zstandard package")
+    dict_id = _publisher_dictionaries().get(_safe_publisher(publisher))
+    dict_data = load_dictionary(dict_id) if dict_id else None
+    return zstandard.ZstdCompressor(level=get_artifact_compression_level(), dict_data=dict_data)
+
+
+def _stream_to_temp(
+    directory: str, chunks: Iterable[bytes], compressor=None
+) -> tuple[str, int, str]:
+    max_bytes = get_max_capture_bytes()
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    encoder = compressor.compressobj() if compressor is not None else None
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"artifact exceeds max size: more than {max_bytes} bytes")
+                digest.update(chunk)
+                handle.write(encoder.compress(chunk) if encoder else chunk)
+            if encoder is not None:
+                handle.write(encoder.flush())
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, size, digest.hexdigest()
+
+
+def write_stream(path: str, chunks: Iterable[bytes]) -> tuple[int, str]:
+    tmp_path, size, sha256 = _stream_to_temp(os.path.dirname(path), chunks)
+    os.replace(tmp_path, path)
+    return size, sha256
 
 
 def write_bytes(path: str, data: bytes) -> tuple[int, str]:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "wb") as handle:
-        handle.write(data)
-    size = os.path.getsize(path)
-    if size > get_max_capture_bytes():
-        os.remove(path)
-        raise ValueError(f"artifact exceeds max size: {size} bytes")
+    if len(data) > get_max_capture_bytes():
+        raise ValueError(f"artifact exceeds max size: {len(data)} bytes")
+    return write_stream(path, [data])
+
+
+def _blob_ext(ext: str, compressor) -> str:
+    return f"{ext}{COMPRESSED_SUFFIX}" if compressor is not None else ext
+
+
+def write_blob_stream(
+    chunks: Iterable[bytes], ext: str, publisher: str | None = None
+) -> tuple[str, int, str]:
+    compressor = _compressor_for(ext, publisher)
+    staging_dir = os.path.join(get_artifact_root(), "blobs", "tmp")
+    tmp_path, size, sha256 = _stream_to_temp(staging_dir, chunks, compressor)
+    path = build_blob_path(sha256, _blob_ext(ext, compressor))
+    if os.path.exists(path):
+        os.remove(tmp_path)
+        os.utime(path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+    return path, size, sha256
+
+
+def write_blob(data: bytes, ext: str, publisher: str | None = None) -> tuple[str, int, str]:
+    if len(data) > get_max_capture_bytes():
+        raise ValueError(f"artifact exceeds max size: {len(data)} bytes")
+    compressor = _compressor_for(ext, publisher)
     sha256 = hashlib.sha256(data).hexdigest()
-    return size, sha256
+    path = build_blob_path(sha256, _blob_ext(ext, compressor))
+    if os.path.exists(path):
+        os.utime(path)
+    else:
+        directory = os.path.dirname(path)
+        tmp_path, _, _ = _stream_to_temp(directory, [data], compressor)
+        os.replace(tmp_path, path)
+    return path, len(data), sha256
 
 
-def write_text(path: str, text: str) -> tuple[int, str]:
-    data = text.encode("utf-8")
-    return write_bytes(path, data)
+def iter_stale_blobs(grace_seconds: float, now: float | None = None) -> Iterator[str]:
+    cutoff = (now if now is not None else time.time()) - grace_seconds
+    blobs_dir = os.path.join(get_artifact_root(), "blobs")
+    for directory, subdirs, files in os.walk(blobs_dir):
+        if directory == blobs_dir:
+            subdirs[:] = [name for name in subdirs if name != "tmp"]
+        for name in files:
+            if name.startswith("."):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    yield path
+            except FileNotFoundError:
+                continue
 
 
-def write_text_bytes(path: str, data: bytes) -> tuple[int, str]:
-    return write_bytes(path, data)
+def read_blob(path: str) -> bytes:
+    with open(path, "rb") as handle:
+        raw = handle.read()
+    if not path.endswith(COMPRESSED_SUFFIX):
+        return raw
+    if zstandard is None:
+        raise RuntimeError(f"reading {path} requires the zstandard package")
+    dict_id = zstandard.get_frame_parameters(raw).dict_id
+    dict_data = load_dictionary(dict_id) if dict_id else None
+    return zstandard.ZstdDecompressor(dict_data=dict_data).decompressobj().decompress(raw)
 
 
-def date_key_for(dt: datetime | None) -> str:
-    if dt is None:
-        return datetime.utcnow().strftime("%Y-%m-%d")
-    return dt.strftime("%Y-%m-%d")
+def iter_blob(path: str, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    if path.endswith(COMPRESSED_SUFFIX):
+        yield read_blob(path)
+        return
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        for start in range(0, len(view), chunk_size):
+            yield view[start : start + chunk_size]
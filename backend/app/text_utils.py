@@ -1,5 +1,6 @@
 import hashlib
 import re
+import struct
 
 _WHITESPACE_RE = re.compile(r"\s+")
 
@@ -12,3 +13,58 @@ def normalize_text(text: str) -> str:
 
 def hash_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+_WORD_RE = re.compile(r"\w+")
+_MINHASH_MASK = (1 << 31) - 1
+_MINHASH_WORDS_PER_DIGEST = 16
+SHINGLE_WORDS = 3
+MINHASH_MIN_WORDS = 20
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 16
+
+
+def _shingles(text: str) -> set[bytes]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < MINHASH_MIN_WORDS:
+        return set()
+    return {
+        " ".join(words[i : i + SHINGLE_WORDS]).encode("utf-8")
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(text: str) -> list[int] | None:
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+    rounds = MINHASH_PERMUTATIONS // _MINHASH_WORDS_PER_DIGEST
+    unpack = struct.Struct(f">{_MINHASH_WORDS_PER_DIGEST}I").unpack
+    rows = [
+        [
+            value
+            for round_index in range(rounds)
+            for value in unpack(
+                hashlib.blake2b(shingle, digest_size=64, person=bytes([round_index])).digest()
+            )
+        ]
+        for shingle in shingles
+    ]
+    return [min(column) & _MINHASH_MASK for column in zip(*rows)]
+
+
+def minhash_bands(signature: list[int]) -> list[int]:
+    rows = len(signature) // MINHASH_BANDS
+    bands = []
+    for band in range(MINHASH_BANDS):
+        chunk = signature[band * rows : (band + 1) * rows]
+        payload = ",".join(str(value) for value in [band, *chunk]).encode("ascii")
+        digest = hashlib.blake2b(payload, digest_size=4).digest()
+        bands.append(int.from_bytes(digest, "big") & _MINHASH_MASK)
+    return bands
+
+
+def minhash_similarity(a: list[int], b: list[int]) -> float:
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
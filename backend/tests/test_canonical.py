@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from app.canonical import canonicalize_url, extract_canonical_link
+
+RULES_PATH = Path(__file__).resolve().parents[1] / "data" / "canonical_rules.json"
+
+
+def test_tracking_params_scheme_and_trailing_slash_collapse():
+    assert canonicalize_url("http://www.Example.com/world/story/?utm_source=x&fbclid=1") == (
+        "https://example.com/world/story"
+    )
+
+
+def test_remaining_query_params_are_sorted():
+    assert canonicalize_url("https://example.com/a?b=2&a=1&utm_medium=rss") == (
+        "https://example.com/a?a=1&b=2"
+    )
+
+
+def test_amp_and_mobile_variants_share_the_canonical_form():
+    expected = "https://example.com/news/story-1"
+    assert canonicalize_url("https://m.example.com/news/story-1") == expected
+    assert canonicalize_url("https://example.com/news/story-1/amp/") == expected
+    assert canonicalize_url("https://example.com/amp/news/story-1") == expected
+    assert canonicalize_url("https://example.com/news/story-1?amp=1") == expected
+
+
+def test_publisher_rule_drops_query(monkeypatch):
+    monkeypatch.setenv("CANONICAL_RULES_PATH", str(RULES_PATH))
+    assert canonicalize_url("https://www.bbc.co.uk/news/world-1?at_custom=1&page=2") == (
+        "https://bbc.co.uk/news/world-1"
+    )
+
+
+def test_extract_canonical_link_resolves_relative_href():
+    html = '<head><link href="/news/a" rel="canonical"><link rel="alternate" href="/x"></head>'
+    assert extract_canonical_link(html, "https://example.com/amp/news/a") == (
+        "https://example.com/news/a"
+    )
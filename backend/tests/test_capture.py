@@ -0,0 +1,50 @@
+import uuid
+
+from app import capture
+from app.canonical import extract_canonical_link
+from app.storage import read_blob
+
+
+class _Response:
+    status_code = 200
+    headers = {"ETag": '"v1"'}
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        return None
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start : start + chunk_size]
+
+
+class _Session:
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    def get(self, *_args, **_kwargs) -> _Response:
+        return _Response(self.body)
+
+
+def test_html_fetch_keeps_a_bounded_head_for_page_checks(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_ROOT", str(tmp_path))
+    head = b'<html><head><link rel="canonical" href="/story"></head><body>'
+    body = head + b"<p>paragraph</p>" * 40000 + b"</body></html>"
+    monkeypatch.setattr(capture, "get_http_session", lambda: _Session(body))
+
+    artifact, validators, head_html = capture._fetch_html_artifact(
+        uuid.uuid4(), "https://news.test/a?utm_source=x", "News"
+    )
+
+    assert read_blob(artifact.storage_uri) == body
+    assert validators == {"etag": '"v1"'}
+    assert len(head_html) == capture.HTML_HEAD_BYTES
+    assert extract_canonical_link(head_html, "https://news.test/a") == "https://news.test/story"
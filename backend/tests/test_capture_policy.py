@@ -0,0 +1,36 @@
+from app.capture_policy import looks_like_shell, visible_text
+
+ARTICLE = "<p>" + "The committee published its findings on Tuesday. " * 20 + "</p>"
+
+
+def test_visible_text_drops_script_and_style_bodies():
+    html = "<html><script>var x = '<p>no</p>';</script><style>p{}</style><p>Yes &amp; more</p>"
+    assert visible_text(html) == "Yes & more"
+
+
+def test_server_rendered_article_is_not_a_shell():
+    assert looks_like_shell(f"<html><body>{ARTICLE}</body></html>") is False
+
+
+def test_js_only_app_shell_is_detected():
+    html = '<html><body><div id="root"></div><script src="/app.js"></script></body></html>'
+    assert looks_like_shell(html) is True
+
+
+def test_structural_paywall_markers_are_detected():
+    for marker in (
+        '<div class="article-body paywall-gate">Subscribers only</div>',
+        "<section data-paywall>Log in</section>",
+        '<script type="application/ld+json">{"isAccessibleForFree": false}</script>',
+        '<script type="application/ld+json">{"isAccessibleForFree":"False"}</script>',
+    ):
+        assert looks_like_shell(f"<html><body>{ARTICLE}{marker}</body></html>") is True, marker
+
+
+def test_subscription_wording_in_an_open_article_is_not_a_paywall():
+    html = (
+        f"<html><body>{ARTICLE}<p>Subscribe to read our weekly newsletter. "
+        '<a href="/next">Continue reading</a> about the paywall debate.</p>'
+        '<div class="no-paywall">Free</div></body></html>'
+    )
+    assert looks_like_shell(html) is False
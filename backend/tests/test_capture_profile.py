@@ -0,0 +1,21 @@
+from app.capture_profile import get_interception_profile
+
+
+def test_ads_profile_blocks_tracker_subdomains_only():
+    profile = get_interception_profile("ads")
+    assert profile.should_block("script", "https://securepubads.g.doubleclick.net/tag.js")
+    assert not profile.should_block("script", "https://www.example.com/app.js")
+    assert not profile.should_block("font", "https://www.example.com/font.woff2")
+
+
+def test_lean_profile_also_blocks_media_and_fonts():
+    profile = get_interception_profile("lean")
+    assert profile.should_block("font", "https://www.example.com/font.woff2")
+    assert profile.should_block("media", "https://cdn.example.com/clip.mp4")
+
+
+def test_none_profile_keeps_networkidle_and_is_recorded():
+    profile = get_interception_profile("none")
+    assert profile.intercepts is False
+    assert profile.wait_until == "networkidle"
+    assert profile.tool_version == "playwright-python;profile=none"
@@ -0,0 +1,49 @@
+import uuid
+
+import pytest
+from rq import Queue
+from rq.utils import import_attribute
+
+from app.capture_queue import CAPTURE_BATCH_JOBS, CAPTURE_JOBS, CaptureHandoff
+
+
+def test_batch_jobs_keep_the_capture_method():
+    assert CAPTURE_BATCH_JOBS.keys() == CAPTURE_JOBS.keys()
+    for method, job in CAPTURE_BATCH_JOBS.items():
+        assert job == CAPTURE_JOBS[method].replace("_job", "_batch_job")
+        assert callable(import_attribute(job))
+
+
+class _Session:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(statement)
+
+
+def test_polite_dispatch_rejects_batches():
+    with pytest.raises(ValueError):
+        CaptureHandoff("text", polite=True, batch_size=10, queue=object())
+
+
+def test_only_items_without_a_live_job_or_host_slot_are_lost():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    queue = Queue(connection=fakeredis.FakeRedis())
+    handoff = CaptureHandoff("adaptive", queue=queue)
+    live, gone, scheduled, dropped = (str(uuid.uuid4()) for _ in range(4))
+    handoff(_Session(), [(live, "https://a.test/1")])
+    job_id = queue.job_ids[0]
+    handoff.scheduler.schedule([(scheduled, "https://b.test/1")], "adaptive")
+
+    lost = handoff.lost(
+        [
+            (live, "https://a.test/1", job_id),
+            (gone, "https://a.test/2", "no-such-job"),
+            (scheduled, "https://b.test/1", None),
+            (dropped, "https://b.test/2", None),
+        ]
+    )
+    assert lost == [gone, dropped]
+    assert handoff.scheduler.claim() == [("b.test", scheduled, "adaptive")]
@@ -0,0 +1,57 @@
+from app.html_text import extract_main_text, extract_main_text_chunks, extract_main_text_from_blob
+
+ARTICLE = "<p>" + "Officials confirmed the bridge will reopen next week. " * 6 + "</p>"
+PAGE = f"""<html><head><title>Wire</title><style>p {{ color: red }}</style></head><body>
+<header class="site-masthead"><a href="/">Home</a></header><nav><a>World</a></nav>
+<div class="cookie-consent">We use cookies</div>
+<script>var tracker = "<p>not text</p>";</script>
+<article><h1>Bridge to reopen &amp; traffic to resume</h1>{ARTICLE}
+<div class="share_tools">Share this</div></article>
+<aside>Most read</aside><footer>Copyright</footer></body></html>"""
+
+
+def test_extract_main_text_drops_scripts_and_boilerplate():
+    text = extract_main_text(PAGE)
+    assert text.startswith("Bridge to reopen & traffic to resume\nOfficials confirmed")
+    for junk in ("Home", "World", "cookies", "tracker", "not text", "Share", "Most read", "color"):
+        assert junk not in text
+
+
+def test_extract_main_text_falls_back_to_page_text_without_an_article():
+    assert extract_main_text("<div>Short <b>page</b></div><nav>Menu</nav><p>tail") == (
+        "Short page\ntail"
+    )
+
+
+def test_extract_main_text_streams_chunks_and_blobs(tmp_path):
+    chunks = [PAGE[i : i + 7] for i in range(0, len(PAGE), 7)]
+    assert extract_main_text_chunks(chunks) == extract_main_text(PAGE)
+    blob = tmp_path / "page.html"
+    blob.write_text(PAGE.replace("resume", "résumé"), encoding="utf-8")
+    assert "traffic to résumé" in extract_main_text_from_blob(str(blob))
+
+
+def test_extract_main_text_closes_an_unterminated_head_at_the_first_body_tag():
+    text = extract_main_text(f"<html><head><title>Wire</title><meta charset=utf-8><p>{ARTICLE}")
+    assert text.startswith("Officials confirmed")
+    assert "Wire" not in text
+
+
+def test_extract_main_text_matches_whole_class_tokens_only():
+    for markup in (
+        f'<body class="single has-sidebar"><div>{ARTICLE}</div></body>',
+        f'<div class="site no-sidebar"><div>{ARTICLE}</div></div>',
+        f'<article class="post has-share-buttons">{ARTICLE}</article>',
+        f'<main class="sidebar">{ARTICLE}</main>',
+    ):
+        assert extract_main_text(markup).startswith("Officials confirmed"), markup
+    text = extract_main_text(f'<div>{ARTICLE}<div class="post share-bar">Share this</div></div>')
+    assert "Share" not in text
+
+
+def test_extract_main_text_falls_back_to_full_text_when_boilerplate_swallows_the_page():
+    assert extract_main_text(f'<div class="menu"><p>{ARTICLE}</p></div>').startswith(
+        "Officials confirmed"
+    )
+    sidebar_heavy = f"<article><p>Short lede.</p></article><aside>{ARTICLE * 3}</aside>"
+    assert "Officials confirmed" in extract_main_text(sidebar_heavy)
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+from app.ingest import (
+    FeedValidators,
+    ParsedFeed,
+    _iter_lines,
+    _update_feed_state,
+    parse_feed,
+)
+from app.models import FeedState
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Wire</title>
+<item><title>Central bank holds rates</title><link>https://wire.test/a</link>
+<pubDate>Wed, 07 Jan 2026 10:00:00 GMT</pubDate></item>
+<item><title>Opinion: the match of the year</title><link>https://wire.test/b</link></item>
+<item><title>No link here</title></item>
+</channel></rss>
+"""
+
+
+def test_parse_feed_filters_entries_off_the_db_thread(tmp_path):
+    feed_path = tmp_path / "feed.xml"
+    feed_path.write_text(RSS, encoding="utf-8")
+    parsed = parse_feed(str(feed_path))
+    assert [entry.url for entry in parsed.entries] == ["https://wire.test/a"]
+    assert parsed.entries[0].publisher == "Wire"
+    assert parsed.entries[0].published_at.year == 2026
+    assert parsed.skipped == 1
+
+
+def test_parse_feed_skips_entries_seen_on_the_last_fetch(tmp_path):
+    feed_path = tmp_path / "feed.xml"
+    feed_path.write_text(RSS, encoding="utf-8")
+    validators = FeedValidators(seen_entry_ids=frozenset({"https://wire.test/a"}))
+    parsed = parse_feed(str(feed_path), validators=validators)
+    assert parsed.entries == []
+    assert parsed.new_entries == 1
+    assert parsed.entry_ids == ["https://wire.test/a", "https://wire.test/b"]
+
+
+def test_feed_poll_interval_adapts_to_activity():
+    now = datetime(2026, 1, 7, tzinfo=timezone.utc)
+    state = FeedState(feed_url="https://wire.test/rss", poll_interval_seconds=900)
+    _update_feed_state(state, ParsedFeed(entries=[], skipped=0, new_entries=3), now)
+    assert state.poll_interval_seconds == 450
+    _update_feed_state(state, ParsedFeed(entries=[], skipped=0, not_modified=True), now)
+    assert state.poll_interval_seconds == 675
+    assert (state.next_fetch_at - now).total_seconds() == 675
+
+
+def test_iter_lines_resumes_from_a_byte_offset(tmp_path):
+    urls_path = tmp_path / "urls.txt"
+    urls = ["https://a.test/1", "https://b.test/é", "https://c.test/3"]
+    urls_path.write_text(f"# seeds\n{urls[0]}\n\n{urls[1]}\n{urls[2]}", encoding="utf-8")
+    lines = list(_iter_lines(str(urls_path)))
+    assert [url for _, url in lines] == urls
+    resumed = list(_iter_lines(str(urls_path), lines[1][0]))
+    assert resumed == lines[2:]
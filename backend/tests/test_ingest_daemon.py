@@ -0,0 +1,64 @@
+import os
+
+from app import ingest_daemon
+from app.ingest import IngestResult
+from app.ingest_daemon import IngestDaemon, WatchedFile
+
+
+class _Session:
+    commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+
+def _touch(path, text, mtime):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_watched_file_reports_only_added_lines(tmp_path):
+    urls_path = tmp_path / "urls.txt"
+    watched = WatchedFile(str(urls_path))
+    assert watched.refresh() is None
+
+    _touch(urls_path, "https://a.test/1\n", 1_000)
+    assert watched.refresh() == ["https://a.test/1"]
+    assert watched.refresh() is None
+
+    _touch(urls_path, "https://a.test/1\n# note\nhttps://a.test/2\n", 2_000)
+    assert watched.refresh() == ["https://a.test/2"]
+
+
+def test_tick_sweeps_feeds_on_change_and_hands_off_new_items(tmp_path, monkeypatch):
+    feeds_path = tmp_path / "feeds.txt"
+    _touch(feeds_path, "https://wire.test/rss\n", 1_000)
+    sweeps = []
+
+    def fake_ingest_rss(db, feed_urls):
+        sweeps.append(list(feed_urls))
+        return IngestResult(created=1, skipped=0, created_items=[("id-1", "https://wire.test/a")])
+
+    monkeypatch.setattr(ingest_daemon, "ingest_rss", fake_ingest_rss)
+    monkeypatch.setattr(
+        ingest_daemon,
+        "claim_source_items",
+        lambda db, ids: [(source_item_id, "https://wire.test/a") for source_item_id in ids],
+    )
+    handed = []
+    daemon = IngestDaemon(
+        str(feeds_path),
+        str(tmp_path / "urls.txt"),
+        lambda db, items: handed.extend(items) or len(items),
+        sweep_seconds=3600,
+    )
+    db = _Session()
+    daemon.tick(db)
+    daemon.tick(db)
+    assert db.commits == 1
+    assert sweeps == [["https://wire.test/rss"]]
+    assert handed == [("id-1", "https://wire.test/a")]
+
+    _touch(feeds_path, "https://wire.test/rss\nhttps://other.test/rss\n", 2_000)
+    daemon.tick(db)
+    assert sweeps[-1] == ["https://wire.test/rss", "https://other.test/rss"]
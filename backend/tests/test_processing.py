@@ -1,4 +1,20 @@
-from app.text_utils import hash_text, normalize_text
+import uuid
+
+import pytest
+
+from sqlalchemy.dialects import postgresql
+
+from app.models import Event
+from app.processing import (
+    NEAR_DUPLICATE_CANDIDATES,
+    EventIndex,
+    cluster_source_item,
+    _known_texts_queries,
+    _NearDuplicateBatch,
+    prepare_text,
+)
+from app.settings import get_near_duplicate_threshold
+from app.text_utils import hash_text, minhash, minhash_bands, minhash_similarity, normalize_text
 
 
 def test_normalize_text_collapses_whitespace():
@@ -10,3 +26,169 @@ def test_normalize_text_collapses_whitespace():
 def test_hash_text_is_deterministic():
     value = "same input"
     assert hash_text(value) == hash_text(value)
+
+
+STORY = (
+    "The central bank held its benchmark rate steady on Wednesday, citing slowing inflation "
+    "and a cooling labour market, while signalling that cuts could begin later this year if "
+    "price pressures continue to ease across housing, energy and services. Policymakers voted "
+    "seven to two to keep the rate unchanged, with the two dissenting members arguing that a "
+    "quarter-point reduction was already justified by weaker hiring and slower wage growth. "
+    "In a statement released after the meeting, the committee said that inflation had fallen "
+    "for a fifth consecutive month but remained above its target, and that it wanted to see "
+    "further evidence of a sustained slowdown before easing policy. The governor told "
+    "reporters that the decision had been finely balanced and that the next meeting in six "
+    "weeks would be live. Markets had priced in a small chance of a cut, and government bond "
+    "yields rose modestly after the announcement while the currency strengthened against the "
+    "dollar. Business groups urged the bank to act sooner, warning that high borrowing costs "
+    "were weighing on investment and that smaller firms in particular were struggling to "
+    "refinance loans taken out when rates were lower. Economists said the tone of the "
+    "statement suggested a cut in the spring remained the most likely outcome, although some "
+    "cautioned that a renewed rise in energy prices could delay it. Mortgage lenders have "
+    "already begun trimming fixed rates in anticipation of lower borrowing costs later in the "
+    "year, and housing market surveys point to a tentative recovery in buyer demand."
+)
+
+
+def test_minhash_links_syndicated_copies_with_a_changed_byline():
+    original = minhash(f"By Jane Doe, Wire Service. {STORY}")
+    syndicated = minhash(f"By Staff, Daily Paper. Updated 10:42. {STORY}")
+    unrelated = minhash(
+        "Fans queued overnight for the stadium reopening, where the home side won a tense "
+        "match in extra time after a late equaliser sent the crowd of thousands into raptures."
+    )
+    assert minhash_similarity(original, syndicated) >= get_near_duplicate_threshold()
+    assert set(minhash_bands(original)) & set(minhash_bands(syndicated))
+    assert minhash_similarity(original, unrelated) < 0.1
+
+
+def test_minhash_skips_texts_too_short_to_compare():
+    assert minhash("Breaking: markets fall") is None
+
+
+def test_event_index_matches_exhaustive_scan_and_ignores_unrelated_events():
+    events = [
+        Event(title="Central bank holds rates steady", date_key="2026-01-07"),
+        Event(title="Storm floods coastal towns", date_key="2026-01-07"),
+    ]
+    indexed = EventIndex(exhaustive=False)
+    indexed.preload("2026-01-07", events)
+    exhaustive = EventIndex()
+    exhaustive.preload("2026-01-07", events)
+
+    title = "Central bank holds interest rates steady"
+    assert indexed.best_match(None, "2026-01-07", title) == exhaustive.best_match(
+        None, "2026-01-07", title
+    )
+    assert indexed.best_match(None, "2026-01-07", title)[0] is events[0]
+    assert indexed.best_match(None, "2026-01-07", "Election results delayed") == (None, 0.0)
+
+
+def test_event_index_matches_previous_day_events_through_member_titles():
+    late = Event(id=uuid.uuid4(), title="Central bank holds rates steady", date_key="2026-01-07")
+    index = EventIndex(window_days=1, member_signatures=4)
+    index.preload("2026-01-07", [late], [(late.id, "Rate decision: bank pauses hiking cycle")])
+    index.preload("2026-01-08", [])
+    index.preload("2026-01-09", [])
+
+    assert index.best_match(None, "2026-01-08", "Central bank holds rates steady again")[0] is late
+    assert index.best_match(None, "2026-01-08", "Bank pauses hiking cycle")[0] is late
+
+
+def test_event_index_prefers_same_day_event_on_ties():
+    earlier = Event(id=uuid.uuid4(), title="Storm floods coastal towns", date_key="2026-01-07")
+    today = Event(id=uuid.uuid4(), title="Storm floods coastal towns", date_key="2026-01-08")
+    index = EventIndex(window_days=1, member_signatures=4)
+    index.preload("2026-01-07", [earlier])
+    index.preload("2026-01-08", [today])
+    index.preload("2026-01-09", [])
+
+    assert index.best_match(None, "2026-01-08", "Storm floods coastal towns")[0] is today
+
+
+def test_prefix_filtered_index_agrees_with_exhaustive_scan_across_the_window():
+    days = {
+        "2026-01-06": ["Storm floods coastal towns", "Minister resigns over expenses row"],
+        "2026-01-07": ["Central bank holds rates steady", "Striking rail workers reject pay offer"],
+        "2026-01-08": ["Wildfire forces evacuation of hill villages"],
+    }
+    members = {
+        "Central bank holds rates steady": "Rate decision: bank pauses hiking cycle",
+        "Storm floods coastal towns": "Seafront homes evacuated as river bursts banks",
+    }
+    titles = [
+        "Central bank holds interest rates steady",
+        "Bank pauses hiking cycle again",
+        "Seafront homes evacuated as river bursts its banks",
+        "Rail workers reject latest pay offer",
+        "Wildfire forces evacuation of more villages",
+        "Election results delayed",
+    ]
+    assignments = []
+    for exhaustive in (True, False):
+        events = {
+            title: Event(id=uuid.uuid4(), title=title, date_key=date_key)
+            for date_key, day_titles in days.items()
+            for title in day_titles
+        }
+        index = EventIndex(exhaustive=exhaustive, window_days=1, member_signatures=4)
+        for date_key, day_titles in days.items():
+            index.preload(
+                date_key,
+                [events[title] for title in day_titles],
+                [(events[title].id, member) for title, member in members.items()],
+            )
+        index.preload("2026-01-05", [])
+        index.preload("2026-01-09", [])
+        matched = []
+        for date_key in days:
+            for title in titles:
+                event, score = index.best_match(None, date_key, title)
+                matched.append((event.title if event else None, score))
+        assignments.append(matched)
+
+    assert assignments[0] == assignments[1]
+    assert assignments[0][1][0] == "Central bank holds rates steady"
+    assert assignments[0][2][0] == "Storm floods coastal towns"
+    assert assignments[0][len(titles) * 2][0] == "Central bank holds rates steady"
+
+
+def test_cluster_source_item_rejects_a_threshold_that_disagrees_with_the_index():
+    with pytest.raises(ValueError):
+        cluster_source_item(None, None, threshold=0.8, index=EventIndex(0.6))
+
+
+def test_event_index_defaults_to_same_day_titles_only():
+    late = Event(id=uuid.uuid4(), title="Central bank holds rates steady", date_key="2026-01-07")
+    index = EventIndex()
+    index.preload("2026-01-07", [late], [(late.id, "Rate decision: bank pauses hiking cycle")])
+    index.preload("2026-01-08", [])
+
+    assert index.best_match(None, "2026-01-08", "Central bank holds rates steady") == (None, 0.0)
+    assert index.best_match(None, "2026-01-07", "Bank pauses hiking cycle") == (None, 0.0)
+
+
+def test_prepared_copies_in_one_batch_link_to_the_first_item():
+    first = prepare_text(uuid.uuid4(), f"By Jane Doe, Wire Service. {STORY}")
+    copy = prepare_text(uuid.uuid4(), f"By Staff, Daily Paper. Updated 10:42. {STORY}")
+    threshold = get_near_duplicate_threshold()
+    batch = _NearDuplicateBatch()
+    assert batch.root_for(first, threshold) is None
+    batch.add(first.text_hash, first.source_item_id, first.minhash, minhash_bands(first.minhash))
+    assert batch.root_for(copy, threshold) == first.source_item_id
+
+
+def test_known_text_lookups_are_capped_per_item():
+    prepared = [prepare_text(uuid.uuid4(), STORY), prepare_text(uuid.uuid4(), "")]
+    by_hash, near = _known_texts_queries(prepared)
+    assert "DISTINCT ON" in str(by_hash.compile(dialect=postgresql.dialect()))
+    compiled = near.compile(dialect=postgresql.dialect())
+    assert "JOIN LATERAL" in str(compiled) and "LIMIT" in str(compiled)
+    assert NEAR_DUPLICATE_CANDIDATES in compiled.params.values()
+
+
+def test_empty_texts_are_never_linked_as_copies():
+    first = prepare_text(uuid.uuid4(), "  ")
+    batch = _NearDuplicateBatch()
+    batch.add(first.text_hash, first.source_item_id, first.minhash, [])
+    assert batch.root_for(prepare_text(uuid.uuid4(), ""), 0.8) is None
@@ -0,0 +1,59 @@
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app import scheduler
+from app.capture import CaptureThrottled
+from app.scheduler import HostScheduler, capture_scheduled_job, host_for, parse_retry_after
+
+
+def test_host_for_groups_www_and_bare_domains():
+    assert host_for("https://www.Example.com/a") == host_for("http://example.com/b")
+
+
+def test_parse_retry_after_accepts_seconds():
+    assert parse_retry_after("120") == 120.0
+
+
+def test_parse_retry_after_accepts_http_date():
+    now = datetime(2026, 1, 7, 12, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("Wed, 07 Jan 2026 12:00:30 GMT", now) == 30.0
+
+
+def test_parse_retry_after_ignores_garbage():
+    assert parse_retry_after("soon") is None
+
+
+def test_expired_leases_free_the_host_slot():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    scheduler = HostScheduler(
+        redis=fakeredis.FakeRedis(), concurrency=1, delay_ms=0, lease_seconds=60
+    )
+    scheduler.schedule([("a", "https://example.com/1"), ("b", "https://example.com/2")])
+    assert scheduler.claim() == [("example.com", "a", "browser")]
+    assert scheduler.claim() == []
+
+    with patch("app.scheduler.time.time", return_value=time.time() + 61):
+        assert scheduler.claim() == [("example.com", "b", "browser")]
+        scheduler.release("example.com", "a")
+        scheduler.release("example.com", "b")
+        assert scheduler.is_idle()
+
+
+def test_throttled_browser_capture_is_requeued_after_retry_after(monkeypatch):
+    released = []
+
+    class _Scheduler:
+        def release(self, *args):
+            released.append(args)
+
+    def throttled(source_item_id):
+        raise CaptureThrottled("https://example.com/1", 429, "120")
+
+    monkeypatch.setitem(scheduler.SCHEDULED_CAPTURE_JOBS, "browser", throttled)
+    monkeypatch.setattr(scheduler, "get_scheduler", lambda: _Scheduler())
+    assert capture_scheduled_job("a", "example.com") == 0
+    assert released == [("example.com", "a", 120.0, "a")]
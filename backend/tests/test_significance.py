@@ -1,4 +1,4 @@
-from app.significance import is_significant
+from app.significance import classify, classify_many, is_significant
 
 
 def test_significant_category_overrides_exclude_tokens():
@@ -15,3 +15,28 @@ def test_whitelist_phrase_in_title_is_significant():
 
 def test_excluded_phrase_in_title_is_filtered():
     assert is_significant([], "Opinion: why this matters", "") is False
+
+
+def test_exclude_phrases_match_inside_words_and_across_phrases():
+    assert is_significant([], "Seafood prices and inflation", "") is False
+    assert is_significant([], "Human rightsports inquiry", "") is False
+
+
+def test_classify_reports_matched_terms():
+    match = classify([], "Central bank weighs sanctions", "")
+    assert match.significant is True
+    assert match.excluded == ()
+    assert match.included == ("central bank", "sanctions")
+
+
+def test_classify_many_matches_single_decisions():
+    entries = [
+        (["Politics"], "", ""),
+        (["Sports"], "Central bank", ""),
+        ([], "Travel tips", "Inflation"),
+        ([], "", ""),
+        (["Politics"], "Other", ""),
+    ]
+    assert [match.significant for match in classify_many(entries)] == [
+        is_significant(*entry) for entry in entries
+    ]
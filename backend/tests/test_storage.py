@@ -0,0 +1,81 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from app.storage import (
+    iter_stale_blobs,
+    read_blob,
+    write_blob,
+    write_blob_stream,
+    write_bytes,
+    write_stream,
+)
+
+
+def test_write_stream_hashes_incrementally(tmp_path):
+    path = tmp_path / "item" / "html.html"
+    size, sha256 = write_stream(str(path), [b"<html>", b"", b"</html>"])
+    assert size == 13
+    assert sha256 == hashlib.sha256(b"<html></html>").hexdigest()
+    assert path.read_bytes() == b"<html></html>"
+
+
+def test_write_stream_aborts_over_cap_without_leaving_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("MAX_CAPTURE_BYTES", "8")
+    path = tmp_path / "item" / "html.html"
+    with pytest.raises(ValueError):
+        write_stream(str(path), [b"12345", b"67890", b"never read"])
+    assert os.listdir(path.parent) == []
+
+
+def test_write_bytes_rejects_oversized_payload_before_writing(tmp_path, monkeypatch):
+    monkeypatch.setenv("MAX_CAPTURE_BYTES", "4")
+    path = tmp_path / "item" / "text.txt"
+    with pytest.raises(ValueError):
+        write_bytes(str(path), b"too large")
+    assert not path.exists()
+
+
+def test_identical_blobs_share_one_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_ROOT", str(tmp_path))
+    first_path, size, sha256 = write_blob(b"wire story", "txt")
+    second_path, _, second_sha = write_blob_stream([b"wire ", b"story"], "txt")
+    assert first_path == second_path
+    assert sha256 == second_sha
+    assert size == len(b"wire story")
+    assert first_path.endswith(f"{sha256}.txt")
+    assert os.listdir(tmp_path / "blobs" / "tmp") == []
+
+
+def test_compressed_blob_round_trips_and_hashes_raw_content(tmp_path, monkeypatch):
+    pytest.importorskip("zstandard")
+    monkeypatch.setenv("ARTIFACT_ROOT", str(tmp_path))
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "zstd")
+    html = b"<html><body>" + b"<p>same paragraph</p>" * 200 + b"</body></html>"
+    path, size, sha256 = write_blob_stream([html[:100], html[100:]], "html", "Wire")
+    assert path.endswith(".html.zst")
+    assert size == len(html)
+    assert sha256 == hashlib.sha256(html).hexdigest()
+    assert os.path.getsize(path) < len(html)
+    assert read_blob(path) == html
+
+
+def test_stale_blobs_skip_staging_and_recently_reused_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_ROOT", str(tmp_path))
+    old_path, _, _ = write_blob(b"old story", "txt")
+    reused_path, _, _ = write_blob(b"reused story", "txt")
+    fresh_path, _, _ = write_blob(b"fresh story", "txt")
+    staging = tmp_path / "blobs" / "tmp"
+    staging.mkdir()
+    (staging / ".x.part").write_bytes(b"partial")
+    (Path(old_path).parent / ".y.part").write_bytes(b"partial")
+    now = time.time()
+    for path in (old_path, reused_path, staging / ".x.part", Path(old_path).parent / ".y.part"):
+        os.utime(path, (now - 3600, now - 3600))
+    write_blob_stream([b"reused ", b"story"], "txt")
+
+    assert list(iter_stale_blobs(600, now=now)) == [old_path]
+    assert os.path.exists(fresh_path)